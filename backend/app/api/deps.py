@@ -1,13 +1,13 @@
 """
 ZAFESYS Suite - API Dependencies
 """
-from typing import Generator, Optional
+from typing import Callable, Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.core.security import decode_access_token
-from app.models import User, UserRole
+from app.models import User, UserRole, Installation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -126,3 +126,30 @@ def get_optional_user(
 
     user = db.query(User).filter(User.id == user_id).first()
     return user if user and user.is_active else None
+
+
+def load_installation_or_404(
+    db: Session, installation_id: int, detail: str = "Installation not found"
+) -> Installation:
+    """Load an installation by id, or 404 with the given detail.
+
+    db.get() checks the session's identity map first, so later lookups of
+    the same row within the request don't hit the database again.
+    """
+    installation = db.get(Installation, installation_id)
+    if not installation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=detail
+        )
+    return installation
+
+
+def installation_dependency(detail: str = "Installation not found") -> Callable[..., Installation]:
+    """Build a dependency that loads the installation named in the path, or 404s with detail."""
+    def get_installation(installation_id: int, db: Session = Depends(get_db)) -> Installation:
+        return load_installation_or_404(db, installation_id, detail)
+    return get_installation
+
+
+get_installation_or_404 = installation_dependency()
@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
 from typing import List
-from datetime import timedelta
+from datetime import datetime, time, timedelta
 
 from app.database import get_db
 from app.models.product import Product
@@ -101,7 +101,6 @@ def get_inventory_summary(db: Session = Depends(get_db)):
     now = now_colombia()
     today_start = today_colombia()
     # Convert to datetime at start of day
-    from datetime import datetime, time
     today_start_dt = datetime.combine(today_start, time.min)
     week_start = today_start_dt - timedelta(days=7)
     thirty_days_ago = now - timedelta(days=30)
@@ -18,7 +18,7 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 @router.post("/init-db")
-async def init_database():
+def init_database():
     """
     Create all database tables.
 
@@ -37,7 +37,7 @@ async def init_database():
 
 
 @router.get("/health-db")
-async def check_database():
+def check_database():
     """
     Check database connection.
     """
@@ -50,7 +50,7 @@ async def check_database():
 
 
 @router.post("/seed-warehouse-user")
-async def seed_warehouse_reviewer(db: Session = Depends(get_db)):
+def seed_warehouse_reviewer(db: Session = Depends(get_db)):
     """
     Create a test warehouse user for Google Play review.
     """
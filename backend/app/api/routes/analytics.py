@@ -10,7 +10,7 @@ from collections import defaultdict
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
 from sqlalchemy import func, and_
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.api.deps import get_db
 from app.models.installation import Installation
@@ -68,7 +68,7 @@ class AnalyticsResponse(BaseModel):
 
 
 @router.get("/installations", response_model=AnalyticsResponse)
-async def get_installation_analytics(
+def get_installation_analytics(
     start_date: Optional[date] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date (YYYY-MM-DD)"),
     technician_id: Optional[int] = Query(None, description="Filter by technician ID"),
@@ -89,7 +89,11 @@ async def get_installation_analytics(
     days_in_period = (end_date - start_date).days + 1
 
     # Base query - completed installations only
-    base_query = db.query(Installation).filter(
+    # technician/product names are read per row below - load them up front
+    base_query = db.query(Installation).options(
+        selectinload(Installation.technician),
+        selectinload(Installation.product),
+    ).filter(
         Installation.status == "completada",
         Installation.scheduled_date >= start_date,
         Installation.scheduled_date <= end_date,
@@ -225,7 +229,7 @@ async def get_installation_analytics(
 
 
 @router.get("/technicians")
-async def get_technicians_list(db: Session = Depends(get_db)):
+def get_technicians_list(db: Session = Depends(get_db)):
     """Get list of technicians for filter dropdown."""
     technicians = db.query(Technician).filter(Technician.is_active == True).all()
     return [{"id": t.id, "name": t.full_name} for t in technicians]
@@ -7,7 +7,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from app.api.deps import get_db, get_current_user
-from app.core.security import create_access_token
+from app.core.security import create_access_token, decode_access_token, verify_pin
 from app.config import settings
 from app import crud
 from app.schemas import Token, UserResponse, UserCreate
@@ -135,8 +135,8 @@ def technician_login(
             detail="PIN no configurado. Contacte al administrador."
         )
     
-    # Verificar PIN (comparación simple, el PIN se guarda en texto plano por simplicidad)
-    if technician.pin != login_data.pin:
+    # Verificar PIN (comparación en tiempo constante; se guarda cifrado)
+    if not verify_pin(login_data.pin, technician.pin):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="PIN incorrecto"
@@ -167,9 +167,6 @@ def get_technician_me(
     
     Este endpoint está protegido, requiere token válido de técnico.
     """
-    from app.core.security import decode_access_token
-    from fastapi import Header
-    
     # Este endpoint se implementará con la dependencia apropiada
     # Por ahora retorna error si no hay implementación
     raise HTTPException(
@@ -188,9 +185,6 @@ def validate_technician_token(
     
     Útil para la app al iniciar para verificar si la sesión sigue activa.
     """
-    from app.core.security import decode_access_token
-    from fastapi import Header
-    
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -7,6 +7,7 @@ from typing import List
 
 from app.api.deps import get_db
 from app.models.customer import Customer
+from app.models.lead import Lead
 from app.schemas.customer import (
     CustomerCreate, CustomerUpdate, CustomerResponse, CustomerListResponse
 )
@@ -100,8 +101,6 @@ def delete_customer(customer_id: int, db: Session = Depends(get_db)):
 @router.post("/from-lead/{lead_id}", response_model=CustomerResponse, status_code=status.HTTP_201_CREATED)
 def create_customer_from_lead(lead_id: int, db: Session = Depends(get_db)):
     """Convert a lead to a customer."""
-    from app.models.lead import Lead
-    
     lead = db.query(Lead).filter(Lead.id == lead_id).first()
     if not lead:
         raise HTTPException(
@@ -3,31 +3,41 @@ ZAFESYS Suite - Google Ads API Routes
 OAuth 2.0 integration for Google Ads account management.
 Uses REAL Google Ads API - NO mock data.
 """
+import asyncio
+import hashlib
 import logging
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+import weakref
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterator, Optional
 from urllib.parse import urlencode
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse
 from pydantic import BaseModel
+from cachetools import TTLCache
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 import httpx
+import ijson
+import orjson
 
 from app.config import settings
 from app.api.deps import get_db
 from app.models.google_ads_account import GoogleAdsAccount
+from app.models.installation import Installation
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 # Log module load
-logger.info("=" * 50)
-logger.info("Google Ads routes module LOADED successfully")
-logger.info(f"GOOGLE_ADS_CLIENT_ID configured: {bool(settings.GOOGLE_ADS_CLIENT_ID)}")
-logger.info(f"GOOGLE_ADS_DEVELOPER_TOKEN configured: {bool(settings.GOOGLE_ADS_DEVELOPER_TOKEN)}")
-logger.info("=" * 50)
+if logger.isEnabledFor(logging.INFO):
+    logger.info(
+        "google_ads routes loaded (client_id=%s, dev_token=%s)",
+        bool(settings.GOOGLE_ADS_CLIENT_ID), bool(settings.GOOGLE_ADS_DEVELOPER_TOKEN),
+    )
 
 router = APIRouter()
 
@@ -40,12 +50,89 @@ GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
 GOOGLE_ADS_API_VERSION = "v19"
 GOOGLE_ADS_BASE_URL = f"https://googleads.googleapis.com/{GOOGLE_ADS_API_VERSION}"
 
+# GAQL templates for /metrics - dates are filled in only after validation
+DAILY_QUERY_TMPL = (
+    "SELECT segments.date, metrics.cost_micros, metrics.impressions, metrics.clicks "
+    "FROM customer "
+    "WHERE segments.date BETWEEN '{start}' AND '{end}' "
+    "ORDER BY segments.date ASC"
+)
+CAMPAIGN_QUERY_TMPL = (
+    "SELECT campaign.id, campaign.name, metrics.cost_micros, metrics.impressions, "
+    "metrics.clicks, metrics.conversions "
+    "FROM campaign "
+    "WHERE segments.date BETWEEN '{start}' AND '{end}' "
+    "AND campaign.status = 'ENABLED'"
+)
+
+# Shared HTTP client - keeps connections to Google alive between requests
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for Google OAuth/Ads calls."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        # HTTP/2 lets concurrent GAQL calls share one connection to Google
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60.0),
+            # Google only gzips responses when the User-Agent also mentions gzip
+            headers={"Accept-Encoding": "gzip", "User-Agent": "zafesys-suite (gzip)"},
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 # Google Ads API scope
 GOOGLE_ADS_SCOPE = "https://www.googleapis.com/auth/adwords email profile"
 
 # Frontend URL for redirects
 FRONTEND_URL = "https://zafesys-suite.vercel.app"
 
+# OAuth client settings are fixed for the life of the process - bind them once
+_CLIENT_ID = settings.GOOGLE_ADS_CLIENT_ID
+_CLIENT_SECRET = settings.GOOGLE_ADS_CLIENT_SECRET
+_REDIRECT_URI = settings.GOOGLE_ADS_REDIRECT_URI
+_OAUTH_CONFIGURED = bool(_CLIENT_ID and _CLIENT_SECRET and _REDIRECT_URI)
+
+if not _OAUTH_CONFIGURED:
+    logger.warning("Google Ads OAuth not configured - /google-ads/auth will return 500")
+
+# Short-lived cache for /status - cleared whenever an account changes
+_status_cache: TTLCache = TTLCache(maxsize=1, ttl=15)
+
+# /metrics payloads keyed by (slot, customer_id, start, end); Ads data lags minutes anyway
+_metrics_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
+_metrics_locks: "weakref.WeakValueDictionary[tuple, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# listAccessibleCustomers results keyed by access token (tokens live ~1h)
+_customers_cache: TTLCache = TTLCache(maxsize=64, ttl=3600)
+
+# Caps in-flight Google Ads API calls so dashboard bursts don't trip rate limits
+_ads_semaphore = asyncio.Semaphore(settings.GOOGLE_ADS_MAX_CONCURRENCY)
+
+# One lock per account slot so only one coroutine refreshes a given token
+_refresh_locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+# OAuth callback redirects are static - build them once
+_REDIRECT_BASE = f"{FRONTEND_URL}/google-ads"
+_REDIRECTS = {
+    "missing_params": f"{_REDIRECT_BASE}?oauth_error=missing_params",
+    "invalid_state": f"{_REDIRECT_BASE}?oauth_error=invalid_state",
+    "token_exchange_failed": f"{_REDIRECT_BASE}?oauth_error=token_exchange_failed",
+    "internal_error": f"{_REDIRECT_BASE}?oauth_error=internal_error",
+    "success": f"{_REDIRECT_BASE}?oauth_success=true",
+}
+
 
 # Pydantic models for request/response
 class GoogleAdsAccountStatus(BaseModel):
@@ -54,11 +141,18 @@ class GoogleAdsAccountStatus(BaseModel):
     customer_id: Optional[str] = None
     account_name: Optional[str] = None
 
+    class Config:
+        from_attributes = True
+        frozen = True
+
 
 class GoogleAdsStatusResponse(BaseModel):
     account1: GoogleAdsAccountStatus
     account2: GoogleAdsAccountStatus
 
+    class Config:
+        frozen = True
+
 
 class DisconnectRequest(BaseModel):
     account: int
@@ -78,6 +172,9 @@ class SpendSummaryResponse(BaseModel):
     spend_last_7_days: float
     currency: str
 
+    class Config:
+        frozen = True
+
 
 class DailySpend(BaseModel):
     date: str
@@ -128,14 +225,39 @@ def get_or_create_account(db: Session, slot: int) -> GoogleAdsAccount:
     ).first()
 
     if not account:
+        # Flush only - the row is committed by whichever request writes to it
         account = GoogleAdsAccount(account_slot=slot, connected=False)
         db.add(account)
-        db.commit()
-        db.refresh(account)
+        db.flush()
 
     return account
 
 
+def get_or_create_accounts(db: Session, slots: tuple[int, ...] = (1, 2)) -> dict[int, GoogleAdsAccount]:
+    """Get or create the account records for several slots with one SELECT."""
+    accounts = {
+        account.account_slot: account
+        for account in db.query(GoogleAdsAccount).filter(
+            GoogleAdsAccount.account_slot.in_(slots)
+        ).all()
+    }
+
+    missing = [GoogleAdsAccount(account_slot=slot, connected=False) for slot in slots if slot not in accounts]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        for account in missing:
+            accounts[account.account_slot] = account
+
+    return accounts
+
+
+def _commit_and_reload(db: Session, account: GoogleAdsAccount) -> None:
+    """Commit and reload the account so later reads don't lazy-load it on the event loop."""
+    db.commit()
+    db.refresh(account)
+
+
 async def refresh_access_token(account: GoogleAdsAccount, db: Session) -> Optional[str]:
     """Refresh the access token using the refresh token."""
     if not account.refresh_token:
@@ -143,53 +265,92 @@ async def refresh_access_token(account: GoogleAdsAccount, db: Session) -> Option
         return None
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                GOOGLE_TOKEN_URL,
-                data={
-                    "client_id": settings.GOOGLE_ADS_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_ADS_CLIENT_SECRET,
-                    "refresh_token": account.refresh_token,
-                    "grant_type": "refresh_token",
-                },
-            )
+        client = get_http_client()
+        response = await client.post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "client_id": _CLIENT_ID,
+                "client_secret": _CLIENT_SECRET,
+                "refresh_token": account.refresh_token,
+                "grant_type": "refresh_token",
+            },
+        )
 
-            if response.status_code == 200:
-                tokens = response.json()
-                account.access_token = tokens.get("access_token")
-                expires_in = tokens.get("expires_in", 3600)
-                account.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
-                db.commit()
-                logger.info(f"Access token refreshed for account {account.account_slot}")
-                return account.access_token
-            else:
-                logger.error(f"Failed to refresh token: {response.text}")
-                return None
+        if response.status_code == 200:
+            tokens = orjson.loads(response.content)
+            access_token = tokens.get("access_token")
+            expires_in = tokens.get("expires_in", 3600)
+            account.access_token = access_token
+            account.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+            await run_in_threadpool(_commit_and_reload, db, account)
+            logger.info(f"Access token refreshed for account {account.account_slot}")
+            return access_token
+        else:
+            logger.error(f"Failed to refresh token: {response.text}")
+            return None
     except Exception as e:
         logger.exception(f"Error refreshing token: {e}")
         return None
 
 
-async def get_valid_access_token(account: GoogleAdsAccount, db: Session) -> Optional[str]:
-    """Get a valid access token, refreshing if necessary."""
+def _token_needs_refresh(account: GoogleAdsAccount) -> bool:
     if not account.access_token:
+        return True
+    if account.expires_at:
+        return account.expires_at <= datetime.now(timezone.utc) + timedelta(seconds=60)
+    return False
+
+
+async def get_valid_access_token(account: GoogleAdsAccount, db: Session) -> Optional[str]:
+    """Get a valid access token, refreshing if necessary.
+
+    Refreshes are serialized per slot so concurrent requests share one
+    round-trip to Google instead of each refreshing the same token.
+    """
+    if not _token_needs_refresh(account):
+        return account.access_token
+
+    async with _refresh_locks[account.account_slot]:
+        # Another request may have refreshed while we waited on the lock
+        await run_in_threadpool(db.refresh, account)
+        if not _token_needs_refresh(account):
+            return account.access_token
         return await refresh_access_token(account, db)
 
-    if account.expires_at:
-        if account.expires_at <= datetime.now(timezone.utc) + timedelta(minutes=5):
-            return await refresh_access_token(account, db)
 
-    return account.access_token
+async def force_refresh_access_token(
+    account: GoogleAdsAccount, db: Session, stale_token: str
+) -> Optional[str]:
+    """Replace a token Google rejected with 401, refreshing at most once per slot.
+
+    Parallel queries that hit the same 401 queue on the slot lock; the first
+    refreshes and the rest pick up the token it stored.
+    """
+    async with _refresh_locks[account.account_slot]:
+        await run_in_threadpool(db.refresh, account)
+        if account.access_token and account.access_token != stale_token:
+            return account.access_token
+        return await refresh_access_token(account, db)
 
 
-async def fetch_accessible_customers(access_token: str) -> tuple[list[str], Optional[str]]:
+async def fetch_accessible_customers(
+    access_token: str,
+    account: Optional[GoogleAdsAccount] = None,
+    db: Optional[Session] = None,
+) -> tuple[list[str], Optional[str]]:
     """Fetch list of accessible Google Ads customer IDs.
     Returns: (customer_ids, error_message)
+
+    If account/db are given, a 401 triggers one token refresh and a retry.
     """
     if not settings.GOOGLE_ADS_DEVELOPER_TOKEN:
         logger.error("GOOGLE_ADS_DEVELOPER_TOKEN is not configured!")
         return [], "Developer token no configurado"
 
+    cached = _customers_cache.get(access_token)
+    if cached is not None:
+        return cached, None
+
     try:
         url = f"{GOOGLE_ADS_BASE_URL}/customers:listAccessibleCustomers"
         headers = {
@@ -200,44 +361,54 @@ async def fetch_accessible_customers(access_token: str) -> tuple[list[str], Opti
         logger.info(f"Calling Google Ads API: {url}")
         logger.info(f"Developer token (first 10 chars): {settings.GOOGLE_ADS_DEVELOPER_TOKEN[:10]}...")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, headers=headers)
-
-            logger.info(f"Response status: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
-            logger.info(f"Response body (first 500 chars): {response.text[:500] if response.text else 'EMPTY'}")
-
-            if response.status_code == 200:
-                if not response.text:
-                    return [], "Google Ads API retornó respuesta vacía"
-
-                data = response.json()
-                # Returns format: {"resourceNames": ["customers/1234567890", ...]}
-                resource_names = data.get("resourceNames", [])
-                customer_ids = [name.split("/")[-1] for name in resource_names]
-                logger.info(f"Found {len(customer_ids)} accessible customers: {customer_ids}")
-                return customer_ids, None
-            elif response.status_code == 401:
-                return [], "Token de acceso inválido o expirado. Reconecta la cuenta."
-            elif response.status_code == 403:
-                # This usually means the developer token doesn't have access
-                try:
-                    error_data = response.json()
-                    error_msg = error_data.get("error", {}).get("message", "Acceso denegado")
-                    error_status = error_data.get("error", {}).get("status", "")
-                    if "DEVELOPER_TOKEN" in str(error_data):
-                        return [], "Developer token sin acceso a producción. Verifica el nivel de acceso en Google Ads API Center."
-                    return [], f"Acceso denegado: {error_msg} ({error_status})"
-                except Exception:
-                    return [], f"Acceso denegado (403): {response.text[:200]}"
-            else:
-                try:
-                    error_data = response.json() if response.text else {}
-                    error_msg = error_data.get("error", {}).get("message", response.text[:200])
-                except Exception:
-                    error_msg = response.text[:200] if response.text else "Respuesta vacía"
-                logger.error(f"Failed to list customers: {error_msg}")
-                return [], f"Error de Google Ads API ({response.status_code}): {error_msg}"
+        client = get_http_client()
+        response = await client.get(url, headers=headers)
+
+        # Token revoked or expired early - refresh once and replay
+        if response.status_code == 401 and account is not None and db is not None:
+            logger.info(f"listAccessibleCustomers unauthorized, refreshing token for account {account.account_slot}")
+            new_token = await force_refresh_access_token(account, db, access_token)
+            if new_token:
+                access_token = new_token
+                headers["Authorization"] = f"Bearer {new_token}"
+                response = await client.get(url, headers=headers)
+
+        logger.info(f"Response status: {response.status_code}")
+        logger.info(f"Response headers: {dict(response.headers)}")
+        logger.info(f"Response body (first 500 chars): {response.text[:500] if response.text else 'EMPTY'}")
+
+        if response.status_code == 200:
+            if not response.text:
+                return [], "Google Ads API retornó respuesta vacía"
+
+            data = orjson.loads(response.content)
+            # Returns format: {"resourceNames": ["customers/1234567890", ...]}
+            resource_names = data.get("resourceNames", [])
+            customer_ids = [name.split("/")[-1] for name in resource_names]
+            logger.info(f"Found {len(customer_ids)} accessible customers: {customer_ids}")
+            _customers_cache[access_token] = customer_ids
+            return customer_ids, None
+        elif response.status_code == 401:
+            return [], "Token de acceso inválido o expirado. Reconecta la cuenta."
+        elif response.status_code == 403:
+            # This usually means the developer token doesn't have access
+            try:
+                error_data = orjson.loads(response.content)
+                error_msg = error_data.get("error", {}).get("message", "Acceso denegado")
+                error_status = error_data.get("error", {}).get("status", "")
+                if "DEVELOPER_TOKEN" in str(error_data):
+                    return [], "Developer token sin acceso a producción. Verifica el nivel de acceso en Google Ads API Center."
+                return [], f"Acceso denegado: {error_msg} ({error_status})"
+            except (orjson.JSONDecodeError, AttributeError):
+                return [], f"Acceso denegado (403): {response.text[:200]}"
+        else:
+            try:
+                error_data = orjson.loads(response.content) if response.content else {}
+                error_msg = error_data.get("error", {}).get("message", response.text[:200])
+            except (orjson.JSONDecodeError, AttributeError):
+                error_msg = response.text[:200] if response.text else "Respuesta vacía"
+            logger.error(f"Failed to list customers: {error_msg}")
+            return [], f"Error de Google Ads API ({response.status_code}): {error_msg}"
     except Exception as e:
         logger.exception(f"Error fetching accessible customers: {e}")
         return [], f"Error de conexión: {str(e)}"
@@ -247,73 +418,182 @@ async def execute_google_ads_query(
     access_token: str,
     customer_id: str,
     query: str,
-    login_customer_id: Optional[str] = None
+    login_customer_id: Optional[str] = None,
+    account: Optional[GoogleAdsAccount] = None,
+    db: Optional[Session] = None,
 ) -> list[dict]:
-    """Execute a GAQL query against Google Ads API."""
-    try:
-        # Remove dashes from customer_id if present
-        clean_customer_id = customer_id.replace("-", "")
+    """Execute a GAQL query against Google Ads API.
 
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "developer-token": settings.GOOGLE_ADS_DEVELOPER_TOKEN,
-            "Content-Type": "application/json",
-        }
+    If account/db are given, a 401 triggers one token refresh and a retry.
+    """
+    async with _ads_semaphore:
+        try:
+            # Remove dashes from customer_id if present
+            clean_customer_id = customer_id.replace("-", "")
 
-        # Add login-customer-id header if specified (for MCC access)
-        if login_customer_id:
-            headers["login-customer-id"] = login_customer_id.replace("-", "")
+            headers = {
+                "Authorization": f"Bearer {access_token}",
+                "developer-token": settings.GOOGLE_ADS_DEVELOPER_TOKEN,
+                "Content-Type": "application/json",
+            }
 
-        url = f"{GOOGLE_ADS_BASE_URL}/customers/{clean_customer_id}/googleAds:search"
+            # Add login-customer-id header if specified (for MCC access)
+            if login_customer_id:
+                headers["login-customer-id"] = login_customer_id.replace("-", "")
 
-        logger.info(f"Executing GAQL query for customer {clean_customer_id}")
-        logger.info(f"Query: {query[:100]}...")
+            url = f"{GOOGLE_ADS_BASE_URL}/customers/{clean_customer_id}/googleAds:search"
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
+            logger.info(f"Executing GAQL query for customer {clean_customer_id}")
+            logger.info(f"Query: {query[:100]}...")
+
+            client = get_http_client()
             response = await client.post(
                 url,
                 headers=headers,
                 json={"query": query},
+                timeout=60.0,
             )
 
+            # Token revoked or expired early - refresh once and replay
+            if response.status_code == 401 and account is not None and db is not None:
+                logger.info(f"GAQL query unauthorized, refreshing token for account {account.account_slot}")
+                new_token = await force_refresh_access_token(account, db, access_token)
+                if new_token:
+                    headers["Authorization"] = f"Bearer {new_token}"
+                    response = await client.post(
+                        url,
+                        headers=headers,
+                        json={"query": query},
+                        timeout=60.0,
+                    )
+
             logger.info(f"Query response status: {response.status_code}")
 
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 results = data.get("results", [])
                 logger.info(f"Query returned {len(results)} results")
                 return results
             else:
                 logger.error(f"Google Ads query failed ({response.status_code}): {response.text[:500]}")
                 return []
-    except Exception as e:
-        logger.exception(f"Error executing Google Ads query: {e}")
-        return []
+        except Exception as e:
+            logger.exception(f"Error executing Google Ads query: {e}")
+            return []
+
+
+async def fetch_customer_is_manager(access_token: str, customer_id: str) -> bool:
+    """Check whether a customer is a manager (MCC) account."""
+    rows = await execute_google_ads_query(
+        access_token, customer_id, "SELECT customer.manager FROM customer LIMIT 1"
+    )
+    return bool(rows and rows[0].get("customer", {}).get("manager"))
+
+
+class _StreamReader:
+    """Async file-like adapter so ijson can parse an httpx response as it arrives."""
+
+    def __init__(self, response: httpx.Response):
+        self._chunks = response.aiter_bytes()
+
+    async def read(self, size: int = -1) -> bytes:
+        # ijson probes with read(0) to detect bytes vs str
+        if size == 0:
+            return b""
+        return await anext(self._chunks, b"")
+
+
+async def stream_google_ads_query(
+    access_token: str,
+    customer_id: str,
+    query: str,
+    login_customer_id: Optional[str] = None,
+    account: Optional[GoogleAdsAccount] = None,
+    db: Optional[Session] = None,
+) -> AsyncIterator[dict]:
+    """Execute a GAQL query via searchStream, yielding rows as they are parsed.
+
+    Same retry behaviour as execute_google_ads_query, but never holds the
+    whole response in memory. Errors are logged and end the stream early.
+    """
+    clean_customer_id = customer_id.replace("-", "")
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "developer-token": settings.GOOGLE_ADS_DEVELOPER_TOKEN,
+        "Content-Type": "application/json",
+    }
+    if login_customer_id:
+        headers["login-customer-id"] = login_customer_id.replace("-", "")
+
+    url = f"{GOOGLE_ADS_BASE_URL}/customers/{clean_customer_id}/googleAds:searchStream"
+    logger.info(f"Streaming GAQL query for customer {clean_customer_id}")
+
+    client = get_http_client()
+    async with _ads_semaphore:
+        try:
+            for attempt in range(2):
+                async with client.stream(
+                    "POST",
+                    url,
+                    headers=headers,
+                    json={"query": query},
+                    timeout=60.0,
+                ) as response:
+                    # Token revoked or expired early - refresh once and replay
+                    if response.status_code == 401 and attempt == 0 and account is not None and db is not None:
+                        logger.info(f"GAQL stream unauthorized, refreshing token for account {account.account_slot}")
+                        new_token = await force_refresh_access_token(account, db, access_token)
+                        if new_token:
+                            headers["Authorization"] = f"Bearer {new_token}"
+                            continue
+
+                    if response.status_code != 200:
+                        body = await response.aread()
+                        logger.error(f"Google Ads stream failed ({response.status_code}): {body[:500]!r}")
+                        return
+
+                    # searchStream returns a JSON array of batches, each with its own results
+                    async for row in ijson.items(_StreamReader(response), "item.results.item", use_float=True):
+                        yield row
+                    return
+        except Exception as e:
+            logger.exception(f"Error streaming Google Ads query: {e}")
 
 
 # ============== ENDPOINTS ==============
 
 @router.get("/status", response_model=GoogleAdsStatusResponse)
-async def get_google_ads_status(db: Session = Depends(get_db)):
+async def get_google_ads_status(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
     """Get connection status of both Google Ads accounts."""
     logger.info("GET /google-ads/status called")
-    account1 = get_or_create_account(db, 1)
-    account2 = get_or_create_account(db, 2)
-
-    return GoogleAdsStatusResponse(
-        account1=GoogleAdsAccountStatus(
-            connected=account1.connected,
-            email=account1.email,
-            customer_id=account1.customer_id,
-            account_name=account1.account_name,
-        ),
-        account2=GoogleAdsAccountStatus(
-            connected=account2.connected,
-            email=account2.email,
-            customer_id=account2.customer_id,
-            account_name=account2.account_name,
-        ),
-    )
+    cached = _status_cache.get("status")
+    if cached is None:
+        accounts = await run_in_threadpool(get_or_create_accounts, db, (1, 2))
+        account1, account2 = accounts[1], accounts[2]
+
+        # The frontend polls this endpoint; let the browser revalidate cheaply
+        etag = '"' + hashlib.blake2b(
+            f"{account1.connected}|{account1.email}|{account1.customer_id}|{account1.account_name}|"
+            f"{account2.connected}|{account2.email}|{account2.customer_id}|{account2.account_name}".encode(),
+            digest_size=8,
+        ).hexdigest() + '"'
+        status_response = GoogleAdsStatusResponse(
+            account1=GoogleAdsAccountStatus.model_validate(account1),
+            account2=GoogleAdsAccountStatus.model_validate(account2),
+        )
+        cached = _status_cache["status"] = (status_response, etag)
+
+    status_response, etag = cached
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=5"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    return status_response
 
 
 @router.get("/auth")
@@ -323,15 +603,15 @@ async def initiate_oauth(
     """Initiate OAuth flow with Google."""
     logger.info(f"GET /google-ads/auth called for account {account}")
 
-    if not settings.GOOGLE_ADS_CLIENT_ID or not settings.GOOGLE_ADS_REDIRECT_URI:
+    if not _OAUTH_CONFIGURED:
         raise HTTPException(
             status_code=500,
             detail="Google Ads OAuth not configured."
         )
 
     params = {
-        "client_id": settings.GOOGLE_ADS_CLIENT_ID,
-        "redirect_uri": settings.GOOGLE_ADS_REDIRECT_URI,
+        "client_id": _CLIENT_ID,
+        "redirect_uri": _REDIRECT_URI,
         "response_type": "code",
         "scope": GOOGLE_ADS_SCOPE,
         "access_type": "offline",
@@ -353,73 +633,83 @@ async def oauth_callback(
     db: Session = Depends(get_db),
 ):
     """OAuth callback from Google."""
-    logger.info("=" * 60)
-    logger.info("GOOGLE ADS CALLBACK RECEIVED!")
-    logger.info(f"Code present: {bool(code)}, State: {state}, Error: {error}")
-    logger.info("=" * 60)
-
-    frontend_redirect = f"{FRONTEND_URL}/google-ads"
+    logger.info("oauth_callback code_present=%s state=%s error=%s", bool(code), state, error)
 
     if error:
-        logger.error(f"OAuth error: {error} - {error_description}")
-        return RedirectResponse(url=f"{frontend_redirect}?oauth_error={error}")
+        logger.error("oauth_callback error=%s description=%s", error, error_description)
+        # Google-supplied value - encode it instead of pasting it into the URL
+        return RedirectResponse(url=f"{_REDIRECT_BASE}?{urlencode({'oauth_error': error})}")
 
     if not code or not state:
-        return RedirectResponse(url=f"{frontend_redirect}?oauth_error=missing_params")
+        return RedirectResponse(url=_REDIRECTS["missing_params"])
 
-    try:
-        account_slot = int(state)
-        if account_slot not in [1, 2]:
-            raise ValueError("Invalid account slot")
-    except ValueError:
-        return RedirectResponse(url=f"{frontend_redirect}?oauth_error=invalid_state")
+    # state is always "1" or "2" (set by /auth)
+    if state not in ("1", "2"):
+        return RedirectResponse(url=_REDIRECTS["invalid_state"])
+    account_slot = ord(state) - 48
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            # Exchange code for tokens
-            token_response = await client.post(
-                GOOGLE_TOKEN_URL,
-                data={
-                    "code": code,
-                    "client_id": settings.GOOGLE_ADS_CLIENT_ID,
-                    "client_secret": settings.GOOGLE_ADS_CLIENT_SECRET,
-                    "redirect_uri": settings.GOOGLE_ADS_REDIRECT_URI,
-                    "grant_type": "authorization_code",
-                },
-            )
+        client = get_http_client()
+        # Exchange code for tokens
+        token_response = await client.post(
+            GOOGLE_TOKEN_URL,
+            data={
+                "code": code,
+                "client_id": _CLIENT_ID,
+                "client_secret": _CLIENT_SECRET,
+                "redirect_uri": _REDIRECT_URI,
+                "grant_type": "authorization_code",
+            },
+        )
 
-            if token_response.status_code != 200:
-                logger.error(f"Token exchange failed: {token_response.text}")
-                return RedirectResponse(url=f"{frontend_redirect}?oauth_error=token_exchange_failed")
+        if token_response.status_code != 200:
+            logger.error(
+                "token_exchange status=%s body=%s",
+                token_response.status_code, token_response.text,
+            )
+            return RedirectResponse(url=_REDIRECTS["token_exchange_failed"])
 
-            tokens = token_response.json()
-            access_token = tokens.get("access_token")
-            refresh_token = tokens.get("refresh_token")
-            expires_in = tokens.get("expires_in", 3600)
+        tokens = orjson.loads(token_response.content)
+        access_token = tokens.get("access_token")
+        refresh_token = tokens.get("refresh_token")
+        expires_in = tokens.get("expires_in", 3600)
 
-            # Get user info
-            userinfo_response = await client.get(
-                GOOGLE_USERINFO_URL,
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
+        # Get user info
+        userinfo_response = await client.get(
+            GOOGLE_USERINFO_URL,
+            headers={"Authorization": f"Bearer {access_token}"},
+        )
 
-            user_email = None
-            if userinfo_response.status_code == 200:
-                userinfo = userinfo_response.json()
-                user_email = userinfo.get("email")
+        user_email = None
+        if userinfo_response.status_code == 200:
+            userinfo = orjson.loads(userinfo_response.content)
+            user_email = userinfo.get("email")
 
-        # Fetch accessible Google Ads customers
-        customer_ids, fetch_error = await fetch_accessible_customers(access_token)
-        customer_id = customer_ids[0] if customer_ids else None
+        account = await run_in_threadpool(get_or_create_account, db, account_slot)
 
-        if customer_id:
-            logger.info(f"Using customer ID: {customer_id}")
+        # Same Google user reconnecting shortly after - reuse the known customer_id
+        recently_synced = (
+            account.updated_at is not None
+            and datetime.now(timezone.utc) - account.updated_at < timedelta(days=1)
+        )
+        if account.customer_id and user_email and account.email == user_email and recently_synced:
+            customer_id = account.customer_id
+            logger.info("oauth_callback reusing customer_id=%s", customer_id)
         else:
-            logger.warning(f"No Google Ads customer found for this account. Error: {fetch_error}")
-            # Still proceed - user can set customer_id manually later
+            # Fetch accessible Google Ads customers
+            customer_ids, fetch_error = await fetch_accessible_customers(access_token)
+            customer_id = customer_ids[0] if customer_ids else None
+
+            if customer_id:
+                logger.info("oauth_callback customer_id=%s", customer_id)
+                # Looked up once per connect so /metrics never queries an MCC blindly
+                account.is_manager = await fetch_customer_is_manager(access_token, customer_id)
+            else:
+                logger.warning("oauth_callback no_customer error=%s", fetch_error)
+                account.is_manager = False
+                # Still proceed - user can set customer_id manually later
 
         # Save to database
-        account = get_or_create_account(db, account_slot)
         account.access_token = access_token
         account.refresh_token = refresh_token
         account.email = user_email
@@ -427,18 +717,20 @@ async def oauth_callback(
         account.expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
         account.connected = True
         account.account_name = f"Cuenta {user_email}" if user_email else f"Cuenta {account_slot}"
-        db.commit()
+        await run_in_threadpool(db.commit)
+        _status_cache.clear()
+        _metrics_cache.clear()
 
-        logger.info(f"SUCCESS! Account {account_slot} connected. Customer ID: {customer_id}")
-        return RedirectResponse(url=f"{frontend_redirect}?oauth_success=true")
+        logger.info("oauth_callback connected slot=%s customer_id=%s", account_slot, customer_id)
+        return RedirectResponse(url=_REDIRECTS["success"])
 
     except Exception as e:
-        logger.exception(f"OAuth callback error: {e}")
-        return RedirectResponse(url=f"{frontend_redirect}?oauth_error=internal_error")
+        logger.exception("oauth_callback failed: %s", e)
+        return RedirectResponse(url=_REDIRECTS["internal_error"])
 
 
 @router.post("/disconnect")
-async def disconnect_account(
+def disconnect_account(
     request: DisconnectRequest,
     db: Session = Depends(get_db),
 ):
@@ -446,15 +738,24 @@ async def disconnect_account(
     if request.account not in [1, 2]:
         raise HTTPException(status_code=400, detail="Account must be 1 or 2")
 
-    account = get_or_create_account(db, request.account)
-    account.access_token = None
-    account.refresh_token = None
-    account.expires_at = None
-    account.email = None
-    account.customer_id = None
-    account.account_name = None
-    account.connected = False
+    # Single UPDATE - no need to load (or create) the row just to clear it
+    db.execute(
+        update(GoogleAdsAccount)
+        .where(GoogleAdsAccount.account_slot == request.account)
+        .values(
+            access_token=None,
+            refresh_token=None,
+            expires_at=None,
+            email=None,
+            customer_id=None,
+            account_name=None,
+            connected=False,
+            is_manager=False,
+        )
+    )
     db.commit()
+    _status_cache.clear()
+    _metrics_cache.clear()
 
     logger.info(f"Google Ads account {request.account} disconnected")
     return {"success": True}
@@ -473,7 +774,7 @@ async def set_customer_id(
     if request.account not in [1, 2]:
         raise HTTPException(status_code=400, detail="Account must be 1 or 2")
 
-    account = get_or_create_account(db, request.account)
+    account = await run_in_threadpool(get_or_create_account, db, request.account)
 
     if not account.connected:
         raise HTTPException(status_code=400, detail="Account not connected. Connect first via OAuth.")
@@ -487,8 +788,14 @@ async def set_customer_id(
             detail="Customer ID debe tener 10 dígitos (ej: 123-456-7890 o 1234567890)"
         )
 
+    access_token = await get_valid_access_token(account, db)
     account.customer_id = clean_id
-    db.commit()
+    account.is_manager = (
+        await fetch_customer_is_manager(access_token, clean_id) if access_token else False
+    )
+    await run_in_threadpool(db.commit)
+    _status_cache.clear()
+    _metrics_cache.clear()
 
     logger.info(f"Customer ID set for account {request.account}: {clean_id}")
     return {"success": True, "customer_id": clean_id}
@@ -500,7 +807,7 @@ async def test_google_ads_connection(
     db: Session = Depends(get_db),
 ):
     """Test the Google Ads API connection and return diagnostic info."""
-    account_record = get_or_create_account(db, account)
+    account_record = await run_in_threadpool(get_or_create_account, db, account)
 
     diagnostics = {
         "account_slot": account,
@@ -533,7 +840,7 @@ async def test_google_ads_connection(
     diagnostics["has_access_token"] = True
 
     # Test fetching accessible customers
-    customer_ids, fetch_error = await fetch_accessible_customers(access_token)
+    customer_ids, fetch_error = await fetch_accessible_customers(access_token, account_record, db)
     diagnostics["accessible_customers"] = customer_ids
 
     if fetch_error:
@@ -546,7 +853,9 @@ async def test_google_ads_connection(
             results = await execute_google_ads_query(
                 access_token,
                 account_record.customer_id,
-                query
+                query,
+                account=account_record,
+                db=db,
             )
             if results:
                 diagnostics["api_test_result"] = "SUCCESS - API responding"
@@ -570,7 +879,7 @@ async def debug_google_ads_query(
     """
     Debug endpoint to test a simple query and see raw response.
     """
-    account_record = get_or_create_account(db, account)
+    account_record = await run_in_threadpool(get_or_create_account, db, account)
 
     if not account_record.connected:
         raise HTTPException(status_code=400, detail="Account not connected")
@@ -585,7 +894,7 @@ async def debug_google_ads_query(
 
     if not cid:
         # Try to get first accessible customer
-        customer_ids, _ = await fetch_accessible_customers(access_token)
+        customer_ids, _ = await fetch_accessible_customers(access_token, account_record, db)
         if customer_ids:
             cid = customer_ids[0]
         else:
@@ -598,24 +907,25 @@ async def debug_google_ads_query(
 
     url = f"{GOOGLE_ADS_BASE_URL}/customers/{clean_cid}/googleAds:search"
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(
-            url,
-            headers={
-                "Authorization": f"Bearer {access_token}",
-                "developer-token": settings.GOOGLE_ADS_DEVELOPER_TOKEN,
-                "Content-Type": "application/json",
-            },
-            json={"query": query},
-        )
+    client = get_http_client()
+    response = await client.post(
+        url,
+        headers={
+            "Authorization": f"Bearer {access_token}",
+            "developer-token": settings.GOOGLE_ADS_DEVELOPER_TOKEN,
+            "Content-Type": "application/json",
+        },
+        json={"query": query},
+        timeout=60.0,
+    )
 
-        return {
-            "customer_id": cid,
-            "url": url,
-            "status_code": response.status_code,
-            "headers": dict(response.headers),
-            "body": response.text[:2000] if response.text else "EMPTY",
-        }
+    return {
+        "customer_id": cid,
+        "url": url,
+        "status_code": response.status_code,
+        "headers": dict(response.headers),
+        "body": response.text[:2000] if response.text else "EMPTY",
+    }
 
 
 @router.get("/list-customers")
@@ -627,7 +937,7 @@ async def list_all_customers(
     List all accessible customers with details.
     Shows if account is manager (MCC) or client, and lists sub-accounts if manager.
     """
-    account_record = get_or_create_account(db, account)
+    account_record = await run_in_threadpool(get_or_create_account, db, account)
 
     if not account_record.connected:
         raise HTTPException(status_code=400, detail="Account not connected")
@@ -638,7 +948,7 @@ async def list_all_customers(
         raise HTTPException(status_code=400, detail="Could not get valid access token")
 
     # Get all accessible customer IDs first
-    customer_ids, fetch_error = await fetch_accessible_customers(access_token)
+    customer_ids, fetch_error = await fetch_accessible_customers(access_token, account_record, db)
 
     if fetch_error:
         return {"error": fetch_error, "customers": []}
@@ -658,7 +968,7 @@ async def list_all_customers(
             LIMIT 1
         """
 
-        results = await execute_google_ads_query(access_token, cid, query)
+        results = await execute_google_ads_query(access_token, cid, query, account=account_record, db=db)
 
         customer_info = {
             "customer_id": cid,
@@ -687,7 +997,7 @@ async def list_all_customers(
                     FROM customer_client
                     WHERE customer_client.level = 1
                 """
-                sub_results = await execute_google_ads_query(access_token, cid, sub_query)
+                sub_results = await execute_google_ads_query(access_token, cid, sub_query, account=account_record, db=db)
 
                 for sub in sub_results:
                     sub_data = sub.get("customerClient", {})
@@ -704,7 +1014,7 @@ async def list_all_customers(
 
 
 @router.get("/spend")
-async def get_spend_summary(
+def get_spend_summary(
     account: int = Query(..., ge=1, le=2),
     db: Session = Depends(get_db),
 ):
@@ -727,6 +1037,8 @@ async def get_spend_summary(
 
 @router.get("/metrics", response_model=MetricsResponse)
 async def get_google_ads_metrics(
+    request: Request,
+    response: Response,
     account: int = Query(..., ge=1, le=2),
     days: int = Query(None, ge=1, le=365),
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
@@ -745,7 +1057,7 @@ async def get_google_ads_metrics(
     """
     logger.info(f"GET /google-ads/metrics called for account {account}, start_date={start_date}, end_date={end_date}, days={days}")
 
-    account_record = get_or_create_account(db, account)
+    account_record = await run_in_threadpool(get_or_create_account, db, account)
 
     if not account_record.connected:
         raise HTTPException(status_code=400, detail="Account not connected")
@@ -778,6 +1090,81 @@ async def get_google_ads_metrics(
         period_end = today
         period_start = today - timedelta(days=days - 1)
 
+    # Computed once, shared by the GAQL queries, the ROI query and the response
+    start_iso = period_start.isoformat()
+    end_iso = period_end.isoformat()
+    period_start_dt = datetime.combine(period_start, datetime.min.time(), tzinfo=timezone.utc)
+    period_end_dt = datetime.combine(period_end, datetime.max.time(), tzinfo=timezone.utc)
+
+    cache_key = (account, account_record.customer_id, start_iso, end_iso)
+    cached = _metrics_cache.get(cache_key)
+    if cached is None:
+        # Concurrent misses for the same key wait here so only one hits Google
+        lock = _metrics_locks.setdefault(cache_key, asyncio.Lock())
+        async with lock:
+            cached = _metrics_cache.get(cache_key)
+            if cached is None:
+                metrics = await _build_metrics_response(
+                    db, account, account_record,
+                    start_iso, end_iso, period_start_dt, period_end_dt,
+                )
+                etag = '"' + hashlib.blake2b(
+                    metrics.model_dump_json().encode(), digest_size=8
+                ).hexdigest() + '"'
+                cached = (metrics, etag)
+                # Only keep real data - errors and empty periods should be retried
+                if metrics.has_data:
+                    _metrics_cache[cache_key] = cached
+
+    metrics, etag = cached
+    cache_headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+
+    return metrics
+
+
+def _completed_installation_totals(db: Session, start: datetime, end: datetime) -> tuple[int, float]:
+    """Count and revenue of installations completed in [start, end]."""
+    total_installations, total_sales = db.query(
+        func.count(Installation.id),
+        func.coalesce(func.sum(Installation.total_price), 0),
+    ).filter(
+        Installation.status == "completada",
+        Installation.completed_at >= start,
+        Installation.completed_at <= end,
+    ).one()
+    return total_installations, float(total_sales or 0)
+
+
+def _date_slices(start: date, end: date, max_days: int = 60, slice_days: int = 30) -> list[tuple[str, str]]:
+    """Split a date range into consecutive ISO (start, end) pairs.
+
+    Ranges up to max_days stay as a single slice.
+    """
+    if (end - start).days <= max_days:
+        return [(start.isoformat(), end.isoformat())]
+
+    slices = []
+    cursor = start
+    while cursor <= end:
+        slice_end = min(cursor + timedelta(days=slice_days - 1), end)
+        slices.append((cursor.isoformat(), slice_end.isoformat()))
+        cursor = slice_end + timedelta(days=1)
+    return slices
+
+
+async def _build_metrics_response(
+    db: Session,
+    account: int,
+    account_record: GoogleAdsAccount,
+    start_iso: str,
+    end_iso: str,
+    period_start_dt: datetime,
+    period_end_dt: datetime,
+) -> MetricsResponse:
+    """Fetch GAQL data and the ROI aggregate for /metrics (uncached)."""
     # Initialize empty response
     daily_spend: list[DailySpend] = []
     campaigns: list[CampaignMetrics] = []
@@ -794,6 +1181,10 @@ async def get_google_ads_metrics(
     elif not settings.GOOGLE_ADS_DEVELOPER_TOKEN:
         message = "Developer token no configurado en el servidor."
         logger.error("GOOGLE_ADS_DEVELOPER_TOKEN not configured")
+    elif account_record.is_manager:
+        # Manager accounts have no customer-level metrics - don't spend two GAQL calls finding out
+        message = "La cuenta vinculada es de administrador (MCC). Configura el Customer ID de una cuenta cliente."
+        logger.warning(f"customer_id for account {account} is a manager account")
     else:
         # Get valid access token
         access_token = await get_valid_access_token(account_record, db)
@@ -804,87 +1195,83 @@ async def get_google_ads_metrics(
         else:
             # Fetch REAL data from Google Ads API
             try:
-                # Query for daily metrics
-                daily_query = f"""
-                    SELECT
-                        segments.date,
-                        metrics.cost_micros,
-                        metrics.impressions,
-                        metrics.clicks
-                    FROM customer
-                    WHERE segments.date BETWEEN '{period_start.strftime("%Y-%m-%d")}' AND '{period_end.strftime("%Y-%m-%d")}'
-                    ORDER BY segments.date ASC
-                """
-
-                daily_results = await execute_google_ads_query(
-                    access_token,
-                    account_record.customer_id,
-                    daily_query
+                # Long ranges are fetched as parallel ~monthly slices (bounded by _ads_semaphore)
+                slices = _date_slices(period_start_dt.date(), period_end_dt.date())
+                # campaign_id -> [name, cost_micros, impressions, clicks, conversions]
+                campaign_totals: dict[str, list] = {}
+
+                async def collect_daily(start: str, end: str) -> tuple[list[DailySpend], float, int, int]:
+                    rows: list[DailySpend] = []
+                    spend_sum = 0.0
+                    impressions_sum = 0
+                    clicks_sum = 0
+                    async for row in stream_google_ads_query(
+                        access_token,
+                        account_record.customer_id,
+                        DAILY_QUERY_TMPL.format(start=start, end=end),
+                        account=account_record,
+                        db=db,
+                    ):
+                        metrics_data = row.get("metrics", {})
+                        cost_micros = int(metrics_data.get("costMicros", 0))
+                        impressions = int(metrics_data.get("impressions", 0))
+                        clicks = int(metrics_data.get("clicks", 0))
+
+                        # Convert micros to actual currency (divide by 1,000,000)
+                        spend = cost_micros / 1_000_000
+
+                        rows.append(DailySpend.model_construct(
+                            date=row.get("segments", {}).get("date", ""),
+                            spend=round(spend, 2),
+                            impressions=impressions,
+                            clicks=clicks
+                        ))
+
+                        spend_sum += spend
+                        impressions_sum += impressions
+                        clicks_sum += clicks
+
+                    return rows, spend_sum, impressions_sum, clicks_sum
+
+                async def collect_campaigns(start: str, end: str) -> None:
+                    async for row in stream_google_ads_query(
+                        access_token,
+                        account_record.customer_id,
+                        CAMPAIGN_QUERY_TMPL.format(start=start, end=end),
+                        account=account_record,
+                        db=db,
+                    ):
+                        campaign_data = row.get("campaign", {})
+                        metrics_data = row.get("metrics", {})
+
+                        totals = campaign_totals.setdefault(
+                            str(campaign_data.get("id", "")),
+                            [campaign_data.get("name", "Sin nombre"), 0, 0, 0, 0.0],
+                        )
+                        totals[1] += int(metrics_data.get("costMicros", 0))
+                        totals[2] += int(metrics_data.get("impressions", 0))
+                        totals[3] += int(metrics_data.get("clicks", 0))
+                        totals[4] += float(metrics_data.get("conversions", 0))
+
+                # Daily and campaign queries are independent - stream them all concurrently
+                daily_parts, _ = await asyncio.gather(
+                    asyncio.gather(*(collect_daily(start, end) for start, end in slices)),
+                    asyncio.gather(*(collect_campaigns(start, end) for start, end in slices)),
                 )
 
-                logger.info(f"Daily query returned {len(daily_results)} results")
-
-                # Process daily results
-                for row in daily_results:
-                    date_str = row.get("segments", {}).get("date", "")
-                    cost_micros = int(row.get("metrics", {}).get("costMicros", 0))
-                    impressions = int(row.get("metrics", {}).get("impressions", 0))
-                    clicks = int(row.get("metrics", {}).get("clicks", 0))
-
-                    # Convert micros to actual currency (divide by 1,000,000)
-                    spend = cost_micros / 1_000_000
-
-                    daily_spend.append(DailySpend(
-                        date=date_str,
-                        spend=round(spend, 2),
-                        impressions=impressions,
-                        clicks=clicks
-                    ))
-
-                    total_spend += spend
-                    total_impressions += impressions
-                    total_clicks += clicks
-                    has_data = True
-
-                # Query for campaign metrics
-                campaign_query = f"""
-                    SELECT
-                        campaign.id,
-                        campaign.name,
-                        metrics.cost_micros,
-                        metrics.impressions,
-                        metrics.clicks,
-                        metrics.conversions
-                    FROM campaign
-                    WHERE segments.date BETWEEN '{period_start.strftime("%Y-%m-%d")}' AND '{period_end.strftime("%Y-%m-%d")}'
-                        AND campaign.status = 'ENABLED'
-                """
-
-                campaign_results = await execute_google_ads_query(
-                    access_token,
-                    account_record.customer_id,
-                    campaign_query
-                )
-
-                logger.info(f"Campaign query returned {len(campaign_results)} results")
-
-                # Process campaign results
-                for row in campaign_results:
-                    campaign_data = row.get("campaign", {})
-                    metrics_data = row.get("metrics", {})
-
-                    campaign_id = str(campaign_data.get("id", ""))
-                    campaign_name = campaign_data.get("name", "Sin nombre")
-                    cost_micros = int(metrics_data.get("costMicros", 0))
-                    impressions = int(metrics_data.get("impressions", 0))
-                    clicks = int(metrics_data.get("clicks", 0))
-                    conversions = int(float(metrics_data.get("conversions", 0)))
+                # Slices come back in date order, so concatenating keeps daily_spend sorted
+                for rows, spend_sum, impressions_sum, clicks_sum in daily_parts:
+                    daily_spend.extend(rows)
+                    total_spend += spend_sum
+                    total_impressions += impressions_sum
+                    total_clicks += clicks_sum
 
+                for campaign_id, (campaign_name, cost_micros, impressions, clicks, conversions) in campaign_totals.items():
                     spend = cost_micros / 1_000_000
                     ctr = (clicks / impressions * 100) if impressions > 0 else 0
                     cpc = (spend / clicks) if clicks > 0 else 0
 
-                    campaigns.append(CampaignMetrics(
+                    campaigns.append(CampaignMetrics.model_construct(
                         campaign_id=campaign_id,
                         campaign_name=campaign_name,
                         spend=round(spend, 2),
@@ -892,9 +1279,12 @@ async def get_google_ads_metrics(
                         clicks=clicks,
                         ctr=round(ctr, 2),
                         cpc=round(cpc, 2),
-                        conversions=conversions
+                        conversions=int(conversions)
                     ))
-                    has_data = True
+
+                has_data = bool(daily_spend or campaigns)
+                logger.info(f"Daily query returned {len(daily_spend)} results in {len(slices)} slice(s)")
+                logger.info(f"Campaign query returned {len(campaigns)} results")
 
                 if not has_data:
                     message = "No hay datos de gasto en el período seleccionado."
@@ -911,21 +1301,14 @@ async def get_google_ads_metrics(
     roi_metrics = None
     if total_spend > 0:
         try:
-            from app.models.installation import Installation
-
-            installations = db.query(Installation).filter(
-                Installation.status == "completada",
-                Installation.completed_at >= datetime.combine(period_start, datetime.min.time()),
-                Installation.completed_at <= datetime.combine(period_end, datetime.max.time()),
-            ).all()
-
-            total_installations = len(installations)
-            total_sales = sum(float(inst.total_price) for inst in installations if inst.total_price)
+            total_installations, total_sales = await run_in_threadpool(
+                _completed_installation_totals, db, period_start_dt, period_end_dt
+            )
 
             roi_percentage = ((total_sales - total_spend) / total_spend) * 100
             cost_per_installation = total_spend / total_installations if total_installations > 0 else 0
 
-            roi_metrics = ROIMetrics(
+            roi_metrics = ROIMetrics.model_construct(
                 total_sales=round(total_sales, 2),
                 total_installations=total_installations,
                 roi_percentage=round(roi_percentage, 2),
@@ -934,10 +1317,10 @@ async def get_google_ads_metrics(
         except Exception as e:
             logger.warning(f"Could not calculate ROI: {e}")
 
-    return MetricsResponse(
+    return MetricsResponse.model_construct(
         account=account,
-        period_start=period_start.isoformat(),
-        period_end=period_end.isoformat(),
+        period_start=start_iso,
+        period_end=end_iso,
         total_spend=round(total_spend, 2),
         total_impressions=total_impressions,
         total_clicks=total_clicks,
@@ -951,5 +1334,3 @@ async def get_google_ads_metrics(
         message=message,
     )
 
-
-logger.info(f"Google Ads router created with {len(router.routes)} routes")
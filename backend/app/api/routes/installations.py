@@ -1,23 +1,76 @@
 """
 ZAFESYS Suite - Installation Routes
 """
-from typing import List
-from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import base64
+from typing import Any, List, Optional, Tuple
+from datetime import date, datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_installation_or_404
 from app import crud
 from app.schemas import (
     InstallationCreate, InstallationUpdate, InstallationResponse,
     InstallationStatusUpdate, InstallationPaymentUpdate, InstallationCompleteRequest
 )
-from app.schemas.installation import TimerStartRequest, TimerResponse
-from app.models import User, InstallationStatus, LeadStatus
+from app.schemas.installation import TimerStartRequest, TimerResponse, InstallationAppResponse
+from app.models import User, Installation, InstallationStatus, LeadStatus
 from app.core.timezone import today_colombia
-from pydantic import BaseModel
+from app.core.cache import LocalCache
+from app.core.http_cache import json_response, make_etag, not_modified
+from app.services.r2_storage import r2_storage
+from pydantic import BaseModel, Field, TypeAdapter
 
 router = APIRouter()
 
+# Short-lived cache for dashboard polls (/stats, /pending); write endpoints clear it.
+_dashboard_cache = LocalCache(maxsize=2, ttl=10)
+
+# Serialized /app/{id} bodies and their ETags, keyed by (id, updated_at): any write
+# to the row bumps updated_at and misses. Lead edits can lag by this TTL (30 s);
+# product and technician names also go through the crud caches' 300 s TTL, so
+# they can lag by up to ~330 s.
+_app_detail_cache = LocalCache(maxsize=512, ttl=30)
+
+# Built once: validates a whole ORM result list in a single pydantic-core call
+_installation_list_adapter = TypeAdapter(List[InstallationResponse])
+_installation_app_adapter = TypeAdapter(InstallationAppResponse)
+
+
+def _installation_list_json(rows: List[Any]) -> bytes:
+    """Validate ORM objects or column rows and dump them to JSON bytes without jsonable_encoder."""
+    return _installation_list_adapter.dump_json(
+        _installation_list_adapter.validate_python(rows, from_attributes=True)
+    )
+
+
+def _invalidate_dashboard_cache() -> None:
+    _dashboard_cache.clear()
+
+
+def _stop_timer_or_raise(db: Session, installation_id: int) -> Installation:
+    """Stop the timer in one conditional UPDATE; on failure, work out why (404 vs 400)."""
+    installation = crud.installation.try_stop_timer(db, id=installation_id)
+    if installation:
+        _invalidate_dashboard_cache()
+        return installation
+
+    installation = crud.installation.get(db, id=installation_id)
+    if not installation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Installation not found"
+        )
+    if installation.timer_started_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Timer has not been started"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Timer has already been stopped"
+    )
+
 
 # ============== PUBLIC ENDPOINTS (for technician app) ==============
 
@@ -26,95 +79,70 @@ class AppTimerStartRequest(BaseModel):
     started_by: str = "technician"
 
 
-@router.get("/app/{installation_id}")
+@router.get("/app/{installation_id}", responses={200: {"model": InstallationAppResponse}})
 def get_installation_for_app(
     installation_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     PUBLIC ENDPOINT - Get installation detail for technician app.
     No authentication required.
     Returns installation with lead and product details.
+    Repeat polls of an unchanged installation cost one single-column SELECT.
     """
-    from app.models import Lead, Product, Technician
+    updated_at = crud.installation.get_updated_at(db, id=installation_id)
+    if updated_at is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Installation not found"
+        )
 
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
+    cached = _app_detail_cache.get_or_compute(
+        (installation_id, updated_at.updated_at),
+        lambda: _build_app_detail(db, installation_id),
+    )
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
 
-    import json
-
-    # Parse photos arrays
-    photos_before = None
-    photos_after = None
-    if installation.photos_before:
-        try:
-            photos_before = json.loads(installation.photos_before)
-        except:
-            pass
-    if installation.photos_after:
-        try:
-            photos_after = json.loads(installation.photos_after)
-        except:
-            pass
-
-    # Build response with related data
-    data = {
-        "id": installation.id,
-        "lead_id": installation.lead_id,
-        "product_id": installation.product_id,
-        "quantity": installation.quantity,
-        "address": installation.address,
-        "city": installation.city,
-        "address_notes": installation.address_notes,
-        "total_price": installation.total_price,
-        "customer_notes": installation.customer_notes,
-        "technician_id": installation.technician_id,
-        "scheduled_date": installation.scheduled_date,
-        "scheduled_time": installation.scheduled_time,
-        "estimated_duration": installation.estimated_duration or 60,
-        "status": installation.status,
-        "payment_status": installation.payment_status,
-        "payment_method": installation.payment_method,
-        "amount_paid": installation.amount_paid or 0,
-        "technician_notes": installation.technician_notes,
-        "completed_at": installation.completed_at,
-        "timer_started_at": installation.timer_started_at,
-        "timer_ended_at": installation.timer_ended_at,
-        "timer_started_by": installation.timer_started_by,
-        "installation_duration_minutes": installation.installation_duration_minutes,
-        "created_at": installation.created_at,
-        "updated_at": installation.updated_at,
-        # Media
-        "signature_url": installation.signature_url,
-        "photos_before": photos_before,
-        "photos_after": photos_after,
-        "video_url": installation.video_url,
-    }
-
-    # Get lead data
-    lead = db.query(Lead).filter(Lead.id == installation.lead_id).first()
+    body, etag = cached
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    return json_response(body, response)
+
+
+def _build_app_detail(db: Session, installation_id: int) -> Optional[Tuple[bytes, str]]:
+    """(body, ETag) of the technician app's view of an installation; None if it doesn't exist."""
+    installation = crud.installation.get_with_lead(db, id=installation_id)
+    if not installation:
+        return None
+
+    # pydantic-core reads the installation's columns and serializes in one pass
+    app_data = InstallationAppResponse.model_validate(installation)
+
+    # Lead came in the same query; product and technician names rarely change and are cached
+    lead = installation.lead
     if lead:
-        data["lead_name"] = lead.name
-        data["lead_phone"] = lead.phone
+        app_data.lead_name = lead.name
+        app_data.lead_phone = lead.phone
 
-    # Get product data
-    product = db.query(Product).filter(Product.id == installation.product_id).first()
+    product = crud.product.get_summary_cached(db, id=installation.product_id)
     if product:
-        data["product_name"] = product.name
-        data["product_model"] = product.model
-        data["product_image"] = product.image_url
+        app_data.product_name = product["name"]
+        app_data.product_model = product["model"]
+        app_data.product_image = product["image_url"]
 
-    # Get technician name
     if installation.technician_id:
-        tech = db.query(Technician).filter(Technician.id == installation.technician_id).first()
-        if tech:
-            data["technician_name"] = tech.full_name
+        app_data.technician_name = crud.technician.get_name_cached(db, id=installation.technician_id)
 
-    return data
+    # The ETag hashes the body since it mixes installation, lead, product and technician data
+    body = _installation_app_adapter.dump_json(app_data)
+    return body, make_etag(body)
 
 
 @router.post("/app/{installation_id}/timer/start", response_model=TimerResponse)
@@ -128,20 +156,20 @@ def start_timer_for_app(
     PUBLIC ENDPOINT - Start installation timer from technician app.
     No authentication required.
     """
-    installation = crud.installation.get(db, id=installation_id)
+    started_by = timer_in.started_by if timer_in else "technician"
+    started = crud.installation.start_timer_by_id(db, id=installation_id, started_by=started_by)
+    if started:
+        installation = started
+        _invalidate_dashboard_cache()
+    else:
+        # Missing, or the timer is already running
+        installation = crud.installation.get(db, id=installation_id)
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
     
-    started_by = timer_in.started_by if timer_in else "technician"
-    installation = crud.installation.start_timer(
-        db,
-        db_obj=installation,
-        started_by=started_by
-    )
-    
     return crud.installation.get_timer_status(installation)
 
 
@@ -155,27 +183,7 @@ def stop_timer_for_app(
     PUBLIC ENDPOINT - Stop installation timer from technician app.
     No authentication required.
     """
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Installation not found"
-        )
-    
-    if installation.timer_started_at is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Timer has not been started"
-        )
-    
-    if installation.timer_ended_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Timer has already been stopped"
-        )
-    
-    installation = crud.installation.stop_timer(db, db_obj=installation)
-    
+    installation = _stop_timer_or_raise(db, installation_id)
     return crud.installation.get_timer_status(installation)
 
 
@@ -189,14 +197,14 @@ def get_timer_for_app(
     PUBLIC ENDPOINT - Get timer status from technician app.
     No authentication required.
     """
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
+    timer_fields = crud.installation.get_timer_fields(db, id=installation_id)
+    if not timer_fields:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
     
-    return crud.installation.get_timer_status(installation)
+    return crud.installation.get_timer_status(timer_fields)
 
 
 @router.patch("/app/{installation_id}/status", response_model=InstallationResponse)
@@ -210,31 +218,42 @@ def update_status_for_app(
     PUBLIC ENDPOINT - Update installation status from technician app.
     No authentication required.
     """
-    installation = crud.installation.get(db, id=installation_id)
+    installation = crud.installation.update_status_by_id(
+        db, id=installation_id, status=status_in.status, commit=False
+    )
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-    installation = crud.installation.update_status(db, db_obj=installation, status=status_in.status)
     
     # If installation is completed, update lead to "instalado"
     if status_in.status == InstallationStatus.COMPLETADA:
-        lead = crud.lead.get(db, id=installation.lead_id)
-        if lead:
-            crud.lead.update_status(db, db_obj=lead, status=LeadStatus.INSTALADO)
+        crud.lead.update_status_by_id(
+            db, id=installation.lead_id, status=LeadStatus.INSTALADO, commit=False
+        )
+    crud.installation.commit_no_expire(db)
+    _invalidate_dashboard_cache()
     
     return installation
 
 
 # ============== MEDIA UPLOAD ENDPOINTS (for technician app) ==============
 
+_MEDIA_FILE_TYPES = ['foto_antes', 'foto_despues', 'firma', 'video']
+
+
 class UploadUrlRequest(BaseModel):
     """Request for generating upload URL."""
     file_type: str  # foto_antes, foto_despues, firma, video
     client_name: str = "cliente"
 
 
+class UploadUrlsRequest(BaseModel):
+    """Request for several upload URLs in one call."""
+    files: list[UploadUrlRequest] = Field(min_length=1, max_length=20)
+
+
 class UploadUrlResponse(BaseModel):
     """Response with presigned upload URL."""
     upload_url: str
@@ -255,27 +274,17 @@ class SaveMediaRequest(BaseModel):
 def get_upload_url_for_app(
     installation_id: int,
     *,
-    db: Session = Depends(get_db),
+    installation: Installation = Depends(get_installation_or_404),
     request: UploadUrlRequest
 ):
     """
     PUBLIC ENDPOINT - Get presigned URL for uploading media.
     No authentication required (for technician app).
     """
-    from app.services.r2_storage import r2_storage
-
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Installation not found"
-        )
-
-    valid_types = ['foto_antes', 'foto_despues', 'firma', 'video']
-    if request.file_type not in valid_types:
+    if request.file_type not in _MEDIA_FILE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file_type. Must be one of: {valid_types}"
+            detail=f"Invalid file_type. Must be one of: {_MEDIA_FILE_TYPES}"
         )
 
     try:
@@ -292,6 +301,41 @@ def get_upload_url_for_app(
         )
 
 
+@router.post("/app/{installation_id}/upload-urls", response_model=list[UploadUrlResponse])
+def get_upload_urls_for_app(
+    installation_id: int,
+    *,
+    installation: Installation = Depends(get_installation_or_404),
+    request: UploadUrlsRequest
+):
+    """
+    PUBLIC ENDPOINT - Get presigned URLs for several files at once.
+    Presigning is local to boto3 (no call to R2), so one request here
+    replaces one upload-url round-trip per photo from the app.
+    """
+    invalid_types = sorted({f.file_type for f in request.files} - set(_MEDIA_FILE_TYPES))
+    if invalid_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid file_type {invalid_types}. Must be one of: {_MEDIA_FILE_TYPES}"
+        )
+
+    try:
+        return [
+            r2_storage.generate_upload_url(
+                installation_id=installation_id,
+                file_type=f.file_type,
+                client_name=f.client_name
+            )
+            for f in request.files
+        ]
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error generating upload URL: {str(e)}"
+        )
+
+
 @router.post("/app/{installation_id}/save-media")
 def save_media_for_app(
     installation_id: int,
@@ -303,66 +347,76 @@ def save_media_for_app(
     PUBLIC ENDPOINT - Save media URLs after upload.
     No authentication required (for technician app).
     """
-    import json
-
-    installation = crud.installation.get(db, id=installation_id)
+    installation = crud.installation.save_media(
+        db,
+        id=installation_id,
+        signature_url=request.signature_url,
+        photos_before=request.photos_before,
+        photos_after=request.photos_after,
+        video_url=request.video_url
+    )
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-
-    # Update signature
-    if request.signature_url is not None:
-        installation.signature_url = request.signature_url
-
-    # Update photos_before (merge with existing)
-    if request.photos_before is not None:
-        existing = []
-        if installation.photos_before:
-            try:
-                existing = json.loads(installation.photos_before)
-            except:
-                pass
-        existing.extend(request.photos_before)
-        installation.photos_before = json.dumps(existing)
-
-    # Update photos_after (merge with existing)
-    if request.photos_after is not None:
-        existing = []
-        if installation.photos_after:
-            try:
-                existing = json.loads(installation.photos_after)
-            except:
-                pass
-        existing.extend(request.photos_after)
-        installation.photos_after = json.dumps(existing)
-
-    # Update video_url
-    if request.video_url is not None:
-        installation.video_url = request.video_url
-
-    db.add(installation)
-    db.commit()
-    db.refresh(installation)
+    _invalidate_dashboard_cache()
 
     return {"status": "ok", "message": "Media saved successfully"}
 
 
 # ============== AUTHENTICATED ENDPOINTS ==============
 
+def _encode_cursor(installation: Any) -> str:
+    raw = f"{installation.created_at.isoformat()}|{installation.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, installation_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(installation_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
 @router.get("/", response_model=List[InstallationResponse])
 def get_installations(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(default=None),
     status_filter: InstallationStatus = Query(default=None)
 ):
-    """Get all installations."""
-    if status_filter:
-        return crud.installation.get_by_status(db, status=status_filter, skip=skip, limit=limit)
-    return crud.installation.get_multi(db, skip=skip, limit=limit)
+    """
+    Get all installations, newest first.
+    Pages with keyset pagination: pass the X-Next-Cursor header of a page as
+    `cursor` to get the next one. `skip` still works but scans skipped rows.
+    Polling clients get a 304 while the page's rows are unchanged.
+    """
+    installations = crud.installation.get_page(
+        db,
+        status=status_filter,
+        after=_decode_cursor(cursor) if cursor else None,
+        skip=0 if cursor else skip,
+        limit=limit
+    )
+    if len(installations) == limit and installations[-1].created_at:
+        response.headers["X-Next-Cursor"] = _encode_cursor(installations[-1])
+
+    # The page is built from installation columns only, so (id, updated_at) of
+    # its rows identifies it; a 304 skips validation and encoding
+    etag = make_etag([(row.id, row.updated_at) for row in installations])
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    return json_response(_installation_list_json(installations), response)
 
 
 @router.get("/pending", response_model=List[InstallationResponse])
@@ -371,7 +425,11 @@ def get_pending_installations(
     current_user: User = Depends(get_current_user)
 ):
     """Get installations pending scheduling."""
-    return crud.installation.get_pending(db)
+    # The cache holds the serialized body, so hits skip validation and encoding
+    return json_response(_dashboard_cache.get_or_compute(
+        "pending",
+        lambda: _installation_list_json(crud.installation.get_pending(db)),
+    ))
 
 
 @router.get("/by-date", response_model=List[InstallationResponse])
@@ -385,35 +443,57 @@ def get_installations_by_date(
     if target_date is None:
         # Use Colombia timezone for "today"
         target_date = today_colombia()
-    return crud.installation.get_by_date(db, target_date=target_date, technician_id=technician_id)
+    return json_response(_installation_list_json(
+        crud.installation.get_by_date(db, target_date=target_date, technician_id=technician_id)
+    ))
 
 
 @router.get("/stats")
 def get_installations_stats(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get installation statistics."""
-    return {
-        "by_status": crud.installation.count_by_status(db),
-        "today_count": crud.installation.get_today_count(db)
-    }
+    stats = _dashboard_cache.get_or_compute("stats", lambda: crud.installation.get_stats_bundle(db))
+    return not_modified(request, response, make_etag(stats)) or stats
+
+
+@router.get("/export")
+def export_installations(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    status_filter: InstallationStatus = Query(default=None)
+):
+    """
+    Export all installations as one JSON array, newest first.
+    Rows are streamed as they are fetched, so memory stays flat however
+    large the table gets.
+    """
+    installations = crud.installation.iter_all(db, status=status_filter)
+
+    def generate():
+        yield b"["
+        for index, installation in enumerate(installations):
+            if index:
+                yield b","
+            yield InstallationResponse.model_validate(installation).model_dump_json().encode()
+        yield b"]"
+
+    return StreamingResponse(generate(), media_type="application/json")
 
 
 @router.get("/{installation_id}", response_model=InstallationResponse)
 def get_installation(
-    installation_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    installation: Installation = Depends(get_installation_or_404)
 ):
     """Get a specific installation."""
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Installation not found"
-        )
-    return installation
+    etag = make_etag(installation.id, installation.created_at, installation.updated_at)
+    return not_modified(request, response, etag) or installation
 
 
 @router.post("/", response_model=InstallationResponse)
@@ -424,37 +504,39 @@ def create_installation(
     installation_in: InstallationCreate
 ):
     """Create a new installation."""
-    # Verify lead exists
-    lead = crud.lead.get(db, id=installation_in.lead_id)
-    if not lead:
+    # Lead, stock and installation writes go out in one transaction with no
+    # up-front reads: each conditional UPDATE doubles as the existence check.
+    # Update lead status to "agendado" (has scheduled installation)
+    if not crud.lead.update_status_by_id(
+        db, id=installation_in.lead_id, status=LeadStatus.AGENDADO, commit=False
+    ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Lead not found"
         )
 
-    # Verify product exists and has stock
-    product = crud.product.get(db, id=installation_in.product_id)
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Product not found"
-        )
-    if product.stock < installation_in.quantity:
+    # Check and decrement stock in one conditional UPDATE - no oversell between concurrent creates
+    new_stock = crud.product.decrement_stock_atomic(
+        db, product_id=installation_in.product_id, quantity=installation_in.quantity
+    )
+    if new_stock is None:
+        db.rollback()
+        # Failure path only: look the product up to report why
+        product = crud.product.get(db, id=installation_in.product_id)
+        if not product:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Product not found"
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Insufficient stock. Available: {product.stock}"
         )
 
-    # Create installation
-    installation = crud.installation.create(db, obj_in=installation_in)
-
-    # Decrease product stock
-    crud.product.update_stock(
-        db, db_obj=product, quantity=installation_in.quantity, operation="subtract"
-    )
-
-    # Update lead status to "agendado" (has scheduled installation)
-    crud.lead.update_status(db, db_obj=lead, status=LeadStatus.AGENDADO)
+    # The INSERT returns server defaults, so nothing needs reloading after commit
+    installation = crud.installation.create(db, obj_in=installation_in, commit=False)
+    crud.installation.commit_no_expire(db)
+    _invalidate_dashboard_cache()
 
     return installation
 
@@ -468,13 +550,15 @@ def update_installation(
     installation_in: InstallationUpdate
 ):
     """Update an installation."""
-    installation = crud.installation.get(db, id=installation_id)
+    installation = crud.installation.update_by_id(
+        db, id=installation_id, values=installation_in.model_dump(exclude_unset=True)
+    )
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-    installation = crud.installation.update(db, db_obj=installation, obj_in=installation_in)
+    _invalidate_dashboard_cache()
     return installation
 
 
@@ -487,19 +571,22 @@ def update_installation_status(
     status_in: InstallationStatusUpdate
 ):
     """Update installation status."""
-    installation = crud.installation.get(db, id=installation_id)
+    installation = crud.installation.update_status_by_id(
+        db, id=installation_id, status=status_in.status, commit=False
+    )
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-    installation = crud.installation.update_status(db, db_obj=installation, status=status_in.status)
     
     # If installation is completed, update lead to "instalado" (now a customer!)
     if status_in.status == InstallationStatus.COMPLETADA:
-        lead = crud.lead.get(db, id=installation.lead_id)
-        if lead:
-            crud.lead.update_status(db, db_obj=lead, status=LeadStatus.INSTALADO)
+        crud.lead.update_status_by_id(
+            db, id=installation.lead_id, status=LeadStatus.INSTALADO, commit=False
+        )
+    crud.installation.commit_no_expire(db)
+    _invalidate_dashboard_cache()
     
     return installation
 
@@ -513,19 +600,19 @@ def update_installation_payment(
     payment_in: InstallationPaymentUpdate
 ):
     """Update installation payment info."""
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Installation not found"
-        )
-    installation = crud.installation.update_payment(
+    installation = crud.installation.update_payment_by_id(
         db,
-        db_obj=installation,
+        id=installation_id,
         payment_status=payment_in.payment_status,
         payment_method=payment_in.payment_method,
         amount_paid=float(payment_in.amount_paid)
     )
+    if not installation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Installation not found"
+        )
+    _invalidate_dashboard_cache()
     return installation
 
 
@@ -538,23 +625,25 @@ def complete_installation(
     complete_in: InstallationCompleteRequest
 ):
     """Mark installation as completed."""
-    installation = crud.installation.get(db, id=installation_id)
+    installation = crud.installation.complete_by_id(
+        db,
+        id=installation_id,
+        technician_notes=complete_in.technician_notes,
+        photo_proof_url=complete_in.photo_proof_url,
+        commit=False
+    )
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-    installation = crud.installation.complete(
-        db,
-        db_obj=installation,
-        technician_notes=complete_in.technician_notes,
-        photo_proof_url=complete_in.photo_proof_url
-    )
     
     # Update lead to "instalado" - now a customer!
-    lead = crud.lead.get(db, id=installation.lead_id)
-    if lead:
-        crud.lead.update_status(db, db_obj=lead, status=LeadStatus.INSTALADO)
+    crud.lead.update_status_by_id(
+        db, id=installation.lead_id, status=LeadStatus.INSTALADO, commit=False
+    )
+    crud.installation.commit_no_expire(db)
+    _invalidate_dashboard_cache()
     
     return installation
 
@@ -574,19 +663,21 @@ def start_installation_timer(
     Can be started by admin or technician.
     If timer is already running, returns current timer status.
     """
-    installation = crud.installation.get(db, id=installation_id)
+    started = crud.installation.start_timer_by_id(
+        db, id=installation_id, started_by=timer_in.started_by
+    )
+    if started:
+        installation = started
+        _invalidate_dashboard_cache()
+    else:
+        # Missing, or the timer is already running
+        installation = crud.installation.get(db, id=installation_id)
     if not installation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
     
-    installation = crud.installation.start_timer(
-        db,
-        db_obj=installation,
-        started_by=timer_in.started_by
-    )
-    
     return crud.installation.get_timer_status(installation)
 
 
@@ -601,27 +692,7 @@ def stop_installation_timer(
     Stop the installation timer.
     Calculates and stores the total duration.
     """
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Installation not found"
-        )
-    
-    if installation.timer_started_at is None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Timer has not been started"
-        )
-    
-    if installation.timer_ended_at is not None:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Timer has already been stopped"
-        )
-    
-    installation = crud.installation.stop_timer(db, db_obj=installation)
-    
+    installation = _stop_timer_or_raise(db, installation_id)
     return crud.installation.get_timer_status(installation)
 
 
@@ -636,28 +707,27 @@ def get_installation_timer(
     Get the current timer status for an installation.
     Includes elapsed time if timer is running.
     """
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
+    timer_fields = crud.installation.get_timer_fields(db, id=installation_id)
+    if not timer_fields:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
     
-    return crud.installation.get_timer_status(installation)
+    return crud.installation.get_timer_status(timer_fields)
 
 
-@router.delete("/{installation_id}")
+@router.delete("/{installation_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_installation(
     installation_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Delete an installation."""
-    installation = crud.installation.get(db, id=installation_id)
-    if not installation:
+    if not crud.installation.remove_by_id(db, id=installation_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Installation not found"
         )
-    crud.installation.remove(db, id=installation_id)
-    return {"message": "Installation deleted"}
+    _invalidate_dashboard_cache()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,11 +1,13 @@
 """
 ZAFESYS Suite - Lead Routes
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_user
 from app import crud
+from app.core.http_cache import make_etag, not_modified
 from app.schemas import (
     LeadCreate, LeadUpdate, LeadResponse, LeadStatusUpdate, LeadKanbanResponse
 )
@@ -13,6 +15,9 @@ from app.models import User, LeadStatus
 
 router = APIRouter()
 
+_kanban_adapter = TypeAdapter(Dict[str, List[LeadKanbanResponse]])
+_lead_list_adapter = TypeAdapter(List[LeadResponse])
+
 
 @router.get("/", response_model=List[LeadResponse])
 def get_leads(
@@ -22,23 +27,30 @@ def get_leads(
     limit: int = 100
 ):
     """Get all leads."""
-    return crud.lead.get_multi(db, skip=skip, limit=limit)
+    leads = _lead_list_adapter.validate_python(crud.lead.get_multi(db, skip=skip, limit=limit), from_attributes=True)
+    return Response(content=_lead_list_adapter.dump_json(leads), media_type="application/json")
 
 
 @router.get("/kanban")
 def get_leads_kanban(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get leads organized for kanban board."""
+    """Get leads organized for kanban board. Polls get a 304 while no lead has changed."""
+    unchanged = not_modified(request, response, make_etag(crud.lead.get_table_version(db)))
+    if unchanged:
+        return unchanged
+
     kanban_data = crud.lead.get_kanban_data(db)
-    # Convert to response format
-    result = {}
-    for status_key, leads in kanban_data.items():
-        result[status_key] = [
-            LeadKanbanResponse.model_validate(lead) for lead in leads
-        ]
-    return result
+    # Validate and serialize the whole board in pydantic-core, skipping jsonable_encoder
+    board = _kanban_adapter.validate_python(kanban_data, from_attributes=True)
+    return Response(
+        content=_kanban_adapter.dump_json(board),
+        media_type="application/json",
+        headers=response.headers
+    )
 
 
 @router.get("/stats")
@@ -1,8 +1,10 @@
 """
 ZAFESYS Suite - Legal Pages (Privacy Policy, Terms)
 """
-from fastapi import APIRouter
+import gzip
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse
+from app.core.http_cache import make_etag
 
 router = APIRouter()
 
@@ -162,10 +164,30 @@ PRIVACY_POLICY_HTML = """
 """
 
 
+# The page only changes between deploys: encode, gzip and tag both variants once.
+# GZipMiddleware passes responses that already carry Content-Encoding through
+# untouched, so the gzip variant sets its own Vary; the middleware adds it to the other.
+_PRIVACY_POLICY_BODY = PRIVACY_POLICY_HTML.encode("utf-8")
+_PRIVACY_POLICY_GZIP = gzip.compress(_PRIVACY_POLICY_BODY, compresslevel=9)
+_CACHE_HEADERS = {"Cache-Control": "public, max-age=86400"}
+_PRIVACY_POLICY_VARIANTS = {
+    False: (_PRIVACY_POLICY_BODY, {**_CACHE_HEADERS, "ETag": make_etag(_PRIVACY_POLICY_BODY)}),
+    True: (_PRIVACY_POLICY_GZIP, {
+        **_CACHE_HEADERS,
+        "ETag": make_etag(_PRIVACY_POLICY_GZIP),
+        "Content-Encoding": "gzip",
+        "Vary": "Accept-Encoding",
+    }),
+}
+
+
 @router.get("/privacy-policy", response_class=HTMLResponse)
-async def get_privacy_policy():
+async def get_privacy_policy(request: Request):
     """
     Returns the privacy policy page for ZAFESYS mobile apps.
     Required for Google Play Store compliance.
     """
-    return HTMLResponse(content=PRIVACY_POLICY_HTML)
+    body, headers = _PRIVACY_POLICY_VARIANTS["gzip" in request.headers.get("accept-encoding", "")]
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="text/html; charset=utf-8", headers=headers)
@@ -1,8 +1,10 @@
 """
 ZAFESYS Suite - Product Routes
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import base64
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from app.api.deps import get_db, get_current_user, get_current_admin
 from app import crud
@@ -10,21 +12,85 @@ from app.schemas import (
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse, ProductStockUpdate
 )
 from app.models import User
+from app.core.cache import LocalCache
+from app.core.http_cache import json_response
 
 router = APIRouter()
 
+# Built once: serializes the cached listing bodies in pydantic-core; uncached
+# endpoints return ORM rows and let the response_model serialize them
+_product_list_adapter = TypeAdapter(List[ProductListResponse])
+
+# Serialized listing bodies (and their next-page cursor) polled by the dashboard
+# and PWA. Writes here clear it; stock moved elsewhere (inventory, installations)
+# shows up within the TTL.
+_list_cache = LocalCache(maxsize=64, ttl=10)
+
+
+def _product_list_json(products: List[Any]) -> bytes:
+    items = _product_list_adapter.validate_python(products, from_attributes=True)
+    return _product_list_adapter.dump_json(items)
+
+
+def _encode_cursor(product: Any) -> str:
+    raw = f"{product.name}|{product.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        name, product_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+        return name, int(product_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def _cached_list(
+    key: tuple,
+    compute: Callable[[], List[Any]],
+    limit: Optional[int] = None
+) -> Tuple[bytes, Optional[str]]:
+    """(body, next_cursor) for a listing; next_cursor is set when a page came back full."""
+    def build() -> Tuple[bytes, Optional[str]]:
+        products = compute()
+        next_cursor = _encode_cursor(products[-1]) if limit and len(products) == limit else None
+        return _product_list_json(products), next_cursor
+
+    return _list_cache.get_or_compute(key, build)
+
+
+def _invalidate_list_cache() -> None:
+    _list_cache.clear()
+
 
 @router.get("/", response_model=List[ProductListResponse])
 def get_products(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(default=None),
     active_only: bool = True
 ):
-    """Get all products."""
+    """
+    Get all products.
+    Active products are keyset-paged by name: pass the X-Next-Cursor header of
+    a page as `cursor` to get the next one. `skip` still works but scans skipped rows.
+    """
     if active_only:
-        return crud.product.get_active(db, skip=skip, limit=limit)
+        after = _decode_cursor(cursor) if cursor else None
+        body, next_cursor = _cached_list(
+            ("active", skip, limit, cursor),
+            lambda: crud.product.get_active(db, after=after, skip=0 if cursor else skip, limit=limit),
+            limit=limit,
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return json_response(body, response)
     return crud.product.get_multi(db, skip=skip, limit=limit)
 
 
@@ -44,7 +110,8 @@ def get_low_stock_products(
     current_user: User = Depends(get_current_user)
 ):
     """Get products with low stock."""
-    return crud.product.get_low_stock(db)
+    body, _ = _cached_list(("low-stock",), lambda: crud.product.get_low_stock(db))
+    return json_response(body)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -78,6 +145,7 @@ def create_product(
             detail="Product with this SKU already exists"
         )
     product = crud.product.create(db, obj_in=product_in)
+    _invalidate_list_cache()
     return product
 
 
@@ -97,6 +165,7 @@ def update_product(
             detail="Product not found"
         )
     product = crud.product.update(db, db_obj=product, obj_in=product_in)
+    _invalidate_list_cache()
     return product
 
 
@@ -109,13 +178,13 @@ def update_product_stock(
     stock_in: ProductStockUpdate
 ):
     """Update product stock."""
-    product = crud.product.get(db, id=product_id)
+    product = crud.product.update_by_id(db, id=product_id, values={"stock": stock_in.stock})
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    product = crud.product.update_stock(db, db_obj=product, quantity=stock_in.stock)
+    _invalidate_list_cache()
     return product
 
 
@@ -138,5 +207,6 @@ def delete_product(
     product.is_active = False
     db.add(product)
     db.commit()
+    _invalidate_list_cache()
     
     return {"message": "Producto eliminado", "id": product_id}
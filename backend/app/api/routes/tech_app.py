@@ -4,16 +4,17 @@ Endpoints for the technician PWA
 """
 from typing import List, Optional
 from datetime import date, datetime, timedelta, timezone
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_
-from pydantic import BaseModel
-import json
-from app.api.deps import get_db
+from pydantic import BaseModel, TypeAdapter
+from app.api.deps import get_db, installation_dependency, load_installation_or_404
 from app import crud
+from app.models.lead import Lead
 from app.models.technician import Technician, TechnicianLocation
-from app.models.installation import Installation, InstallationStatus, PaymentStatus, PaymentMethod
-from app.core.security import create_access_token
+from app.models.installation import Installation, InstallationStatus, PaymentMethod
+from app.core.http_cache import json_response, make_etag, not_modified
+from app.core.security import create_access_token, verify_pin
 from app.services.r2_storage import get_r2_service
 
 router = APIRouter()
@@ -157,17 +158,42 @@ class LocationHistoryResponse(BaseModel):
         from_attributes = True
 
 
+# Values the app may send, mapped to their enum members once
+_TECH_STATUSES = {
+    s.value: s for s in (InstallationStatus.EN_CAMINO, InstallationStatus.EN_PROGRESO, InstallationStatus.COMPLETADA)
+}
+_PAYMENT_METHODS = frozenset(m.value for m in PaymentMethod)
+
+# Built once: serialize the polled lists in pydantic-core, skipping FastAPI's
+# response_model re-validation
+_tech_installation_list_adapter = TypeAdapter(List[TechInstallationResponse])
+_location_list_adapter = TypeAdapter(List[TechnicianLocationResponse])
+_location_history_adapter = TypeAdapter(List[LocationHistoryResponse])
+
+
 # ============================================================
-# HELPERS
+# DEPENDENCIES
 # ============================================================
 
-def parse_photos_json(photos_str: Optional[str]) -> Optional[List[str]]:
-    if not photos_str:
-        return None
-    try:
-        return json.loads(photos_str)
-    except:
-        return None
+_INSTALLATION_NOT_FOUND = "Instalacion no encontrada"
+
+_get_installation = installation_dependency(_INSTALLATION_NOT_FOUND)
+
+
+def _load_own_installation(db: Session, installation_id: int, technician_id: int) -> Installation:
+    """Load an installation assigned to the technician: 404 if missing, 403 if someone else's.
+
+    Also used after a guarded UPDATE matched no row, to explain why.
+    """
+    installation = load_installation_or_404(db, installation_id, _INSTALLATION_NOT_FOUND)
+    if installation.technician_id != technician_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
+    return installation
+
+
+def _get_own_installation(installation_id: int, technician_id: int, db: Session = Depends(get_db)) -> Installation:
+    """Installation dependency that also checks it is assigned to the calling technician."""
+    return _load_own_installation(db, installation_id, technician_id)
 
 
 # ============================================================
@@ -176,18 +202,7 @@ def parse_photos_json(photos_str: Optional[str]) -> Optional[List[str]]:
 
 @router.post("/login", response_model=TechLoginResponse)
 def tech_login(request: TechLoginRequest, db: Session = Depends(get_db)):
-    phone = request.phone.strip()
-    if not phone.startswith("+"):
-        phone = f"+57{phone}" if phone.startswith("3") else phone
-
-    technician = crud.technician.get_by_phone(db, phone=phone)
-
-    if not technician:
-        phone_without_code = phone.replace("+57", "").replace("+", "")
-        technician = db.query(Technician).filter(
-            Technician.phone.contains(phone_without_code),
-            Technician.is_active == True
-        ).first()
+    technician = crud.technician.get_by_phone_digits(db, phone=request.phone)
 
     if not technician:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Telefono no registrado")
@@ -199,7 +214,7 @@ def tech_login(request: TechLoginRequest, db: Session = Depends(get_db)):
         technician.pin = request.pin
         db.add(technician)
         db.commit()
-    elif technician.pin != request.pin:
+    elif not verify_pin(request.pin, technician.pin):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="PIN incorrecto")
 
     token = create_access_token(subject=f"tech:{technician.id}", role="technician")
@@ -212,7 +227,7 @@ def tech_login(request: TechLoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/my-installations", response_model=List[TechInstallationResponse])
-def get_my_installations(technician_id: int, target_date: Optional[date] = None, db: Session = Depends(get_db)):
+def get_my_installations(request: Request, response: Response, technician_id: int, target_date: Optional[date] = None, db: Session = Depends(get_db)):
     if target_date is None:
         target_date = date.today()
 
@@ -220,100 +235,35 @@ def get_my_installations(technician_id: int, target_date: Optional[date] = None,
     if not technician:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tecnico no encontrado")
 
-    installations = crud.installation.get_technician_day_schedule(db, technician_id=technician_id, target_date=target_date)
-
-    result = []
-    for inst in installations:
-        result.append(TechInstallationResponse(
-            id=inst.id,
-            lead_name=inst.lead.name if inst.lead else "Sin nombre",
-            lead_phone=inst.lead.phone if inst.lead else "",
-            product_name=inst.product.name if inst.product else "Sin producto",
-            product_model=inst.product.model if inst.product else "",
-            product_image=inst.product.image_url if inst.product else None,
-            scheduled_date=inst.scheduled_date,
-            scheduled_time=str(inst.scheduled_time) if inst.scheduled_time else None,
-            address=inst.address,
-            city=inst.city,
-            address_notes=inst.address_notes,
-            status=inst.status.value,
-            payment_status=inst.payment_status.value,
-            total_price=float(inst.total_price),
-            amount_paid=float(inst.amount_paid),
-            customer_notes=inst.customer_notes,
-            timer_started_at=inst.timer_started_at,
-            timer_ended_at=inst.timer_ended_at,
-            timer_started_by=inst.timer_started_by,
-            installation_duration_minutes=inst.installation_duration_minutes,
-            signature_url=inst.signature_url,
-            photos_before=parse_photos_json(inst.photos_before),
-            photos_after=parse_photos_json(inst.photos_after),
-            video_url=inst.video_url
-        ))
-
-    return result
+    rows = crud.installation.get_tech_app_day(db, technician_id=technician_id, target_date=target_date)
+    body = _tech_installation_list_adapter.dump_json(
+        [TechInstallationResponse.model_construct(**row._mapping) for row in rows]
+    )
+    # Polled constantly and usually unchanged: hashing the body also catches lead/product edits
+    return not_modified(request, response, make_etag(body)) or json_response(body, response)
 
 
 @router.get("/installations/{installation_id}", response_model=TechInstallationResponse)
 def get_installation_detail(installation_id: int, technician_id: int, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
-
-    if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado para ver esta instalacion")
-
-    return TechInstallationResponse(
-        id=installation.id,
-        lead_name=installation.lead.name if installation.lead else "Sin nombre",
-        lead_phone=installation.lead.phone if installation.lead else "",
-        product_name=installation.product.name if installation.product else "Sin producto",
-        product_model=installation.product.model if installation.product else "",
-        product_image=installation.product.image_url if installation.product else None,
-        scheduled_date=installation.scheduled_date,
-        scheduled_time=str(installation.scheduled_time) if installation.scheduled_time else None,
-        address=installation.address,
-        city=installation.city,
-        address_notes=installation.address_notes,
-        status=installation.status.value,
-        payment_status=installation.payment_status.value,
-        total_price=float(installation.total_price),
-        amount_paid=float(installation.amount_paid),
-        customer_notes=installation.customer_notes,
-        timer_started_at=installation.timer_started_at,
-        timer_ended_at=installation.timer_ended_at,
-        timer_started_by=installation.timer_started_by,
-        installation_duration_minutes=installation.installation_duration_minutes,
-        signature_url=installation.signature_url,
-        photos_before=parse_photos_json(installation.photos_before),
-        photos_after=parse_photos_json(installation.photos_after),
-        video_url=installation.video_url
-    )
+    row = crud.installation.get_tech_app_card(db, id=installation_id, technician_id=technician_id)
+    if row is None:
+        # Raises the matching 404/403
+        _load_own_installation(db, installation_id, technician_id)
+    return json_response(TechInstallationResponse.model_construct(**row._mapping).model_dump_json().encode())
 
 
 @router.patch("/installations/{installation_id}/status")
 def update_installation_status(installation_id: int, technician_id: int, request: TechStatusUpdateRequest, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
+    new_status = _TECH_STATUSES.get(request.status)
+    if new_status is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Estado invalido. Use: {', '.join(_TECH_STATUSES)}")
 
+    # One guarded UPDATE; the row is only loaded to explain a failure
+    installation = crud.installation.update_status_by_id(
+        db, id=installation_id, status=new_status, technician_id=technician_id
+    )
     if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
-    valid_statuses = ["en_camino", "en_progreso", "completada"]
-    if request.status not in valid_statuses:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Estado invalido. Use: {', '.join(valid_statuses)}")
-
-    new_status = InstallationStatus(request.status)
-    installation.status = new_status
-
-    if new_status == InstallationStatus.COMPLETADA:
-        installation.completed_at = datetime.now(timezone.utc)
-
-    db.add(installation)
-    db.commit()
+        _load_own_installation(db, installation_id, technician_id)
 
     return {"message": "Estado actualizado", "status": request.status}
 
@@ -323,12 +273,7 @@ def update_installation_status(installation_id: int, technician_id: int, request
 # ============================================================
 
 @router.post("/installations/{installation_id}/upload-url", response_model=UploadUrlResponse)
-def get_upload_url(installation_id: int, request: UploadUrlRequest, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
-
-    if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
+def get_upload_url(installation_id: int, request: UploadUrlRequest, installation: Installation = Depends(_get_installation)):
     valid_types = ["foto_antes", "foto_despues", "firma", "video"]
     if request.file_type not in valid_types:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Tipo invalido. Use: {', '.join(valid_types)}")
@@ -347,35 +292,24 @@ def get_upload_url(installation_id: int, request: UploadUrlRequest, db: Session
 
 @router.post("/installations/{installation_id}/save-media")
 def save_media_references(installation_id: int, request: SaveMediaRequest, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
+    # Falsy fields are left untouched; photo URLs are appended server-side
+    installation = crud.installation.save_media(
+        db,
+        id=installation_id,
+        signature_url=request.signature_url or None,
+        photos_before=request.photos_before or None,
+        photos_after=request.photos_after or None,
+        video_url=request.video_url or None
+    )
 
     if not installation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
 
-    if request.signature_url:
-        installation.signature_url = request.signature_url
-
-    if request.photos_before:
-        existing = parse_photos_json(installation.photos_before) or []
-        existing.extend(request.photos_before)
-        installation.photos_before = json.dumps(existing)
-
-    if request.photos_after:
-        existing = parse_photos_json(installation.photos_after) or []
-        existing.extend(request.photos_after)
-        installation.photos_after = json.dumps(existing)
-
-    if request.video_url:
-        installation.video_url = request.video_url
-
-    db.add(installation)
-    db.commit()
-
     return {
         "message": "Media guardada",
         "signature_url": installation.signature_url,
-        "photos_before": parse_photos_json(installation.photos_before),
-        "photos_after": parse_photos_json(installation.photos_after),
+        "photos_before": installation.photos_before,
+        "photos_after": installation.photos_after,
         "video_url": getattr(installation, 'video_url', None)
     }
 
@@ -385,15 +319,7 @@ def save_media_references(installation_id: int, request: SaveMediaRequest, db: S
 # ============================================================
 
 @router.post("/installations/{installation_id}/timer/start", response_model=TechTimerResponse)
-def start_timer(installation_id: int, technician_id: int, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
-
-    if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
+def start_timer(db: Session = Depends(get_db), installation: Installation = Depends(_get_own_installation)):
     if installation.timer_started_at and not installation.timer_ended_at:
         timer_status = crud.installation.get_timer_status(installation)
         return TechTimerResponse(**timer_status)
@@ -405,35 +331,21 @@ def start_timer(installation_id: int, technician_id: int, db: Session = Depends(
 
 @router.post("/installations/{installation_id}/timer/stop", response_model=TechTimerResponse)
 def stop_timer(installation_id: int, technician_id: int, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
+    # One guarded UPDATE; the row is only loaded to explain a failure
+    installation = crud.installation.try_stop_timer(db, id=installation_id, technician_id=technician_id)
 
     if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
-    if installation.timer_started_at is None:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El timer no ha sido iniciado")
-
-    if installation.timer_ended_at is not None:
+        installation = _load_own_installation(db, installation_id, technician_id)
+        if installation.timer_started_at is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El timer no ha sido iniciado")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El timer ya fue detenido")
 
-    installation = crud.installation.stop_timer(db, db_obj=installation)
     timer_status = crud.installation.get_timer_status(installation)
     return TechTimerResponse(**timer_status)
 
 
 @router.get("/installations/{installation_id}/timer", response_model=TechTimerResponse)
-def get_timer_status(installation_id: int, technician_id: int, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
-
-    if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
+def get_timer_status(installation: Installation = Depends(_get_own_installation)):
     timer_status = crud.installation.get_timer_status(installation)
     return TechTimerResponse(**timer_status)
 
@@ -444,47 +356,27 @@ def get_timer_status(installation_id: int, technician_id: int, db: Session = Dep
 
 @router.post("/installations/{installation_id}/confirm-payment")
 def confirm_payment(installation_id: int, technician_id: int, request: TechPaymentConfirmRequest, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
+    # Unknown methods still record the payment, just without a method
+    payment_method = request.method if request.method in _PAYMENT_METHODS else None
 
+    # One atomic UPDATE; the row is only loaded to explain a failure
+    installation = crud.installation.add_payment_by_id(
+        db, id=installation_id, amount=request.amount,
+        payment_method=payment_method, technician_id=technician_id
+    )
     if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
-    installation.amount_paid = float(installation.amount_paid or 0) + request.amount
-
-    try:
-        installation.payment_method = PaymentMethod(request.method)
-    except ValueError:
-        pass
-
-    if installation.amount_paid >= float(installation.total_price):
-        installation.payment_status = PaymentStatus.PAGADO
-    elif installation.amount_paid > 0:
-        installation.payment_status = PaymentStatus.PARCIAL
-
-    db.add(installation)
-    db.commit()
+        installation = _load_own_installation(db, installation_id, technician_id)
 
     return {
         "message": "Pago registrado",
         "amount_paid": float(installation.amount_paid),
         "total_price": float(installation.total_price),
-        "payment_status": installation.payment_status.value
+        "payment_status": installation.payment_status
     }
 
 
 @router.post("/installations/{installation_id}/complete")
-def complete_installation(installation_id: int, technician_id: int, request: TechCompleteRequest, db: Session = Depends(get_db)):
-    installation = crud.installation.get(db, id=installation_id)
-
-    if not installation:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Instalacion no encontrada")
-
-    if installation.technician_id != technician_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No autorizado")
-
+def complete_installation(request: TechCompleteRequest, db: Session = Depends(get_db), installation: Installation = Depends(_get_own_installation)):
     if installation.timer_started_at and not installation.timer_ended_at:
         crud.installation.stop_timer(db, db_obj=installation)
 
@@ -518,13 +410,13 @@ def update_availability(technician_id: int, request: TechAvailabilityRequest, db
 
 
 @router.get("/profile")
-def get_tech_profile(technician_id: int, db: Session = Depends(get_db)):
+def get_tech_profile(request: Request, response: Response, technician_id: int, db: Session = Depends(get_db)):
     technician = crud.technician.get(db, id=technician_id)
 
     if not technician:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Tecnico no encontrado")
 
-    return {
+    profile = {
         "id": technician.id,
         "full_name": technician.full_name,
         "phone": technician.phone,
@@ -534,6 +426,7 @@ def get_tech_profile(technician_id: int, db: Session = Depends(get_db)):
         "is_active": technician.is_active,
         "tracking_enabled": getattr(technician, 'tracking_enabled', True)
     }
+    return not_modified(request, response, make_etag(profile)) or profile
 
 
 # ============================================================
@@ -573,7 +466,10 @@ def get_all_technician_locations(db: Session = Depends(get_db)):
         func.max(TechnicianLocation.recorded_at).label('max_recorded_at')
     ).group_by(TechnicianLocation.technician_id).subquery()
     
-    results = db.query(TechnicianLocation, Technician).join(
+    # The current installation's card fields come from the same query, as plain strings
+    results = db.query(
+        TechnicianLocation, Technician, Installation.address, Installation.status, Lead.name
+    ).join(
         latest_location_subq,
         and_(
             TechnicianLocation.technician_id == latest_location_subq.c.technician_id,
@@ -582,6 +478,12 @@ def get_all_technician_locations(db: Session = Depends(get_db)):
     ).join(
         Technician,
         TechnicianLocation.technician_id == Technician.id
+    ).outerjoin(
+        Installation,
+        TechnicianLocation.installation_id == Installation.id
+    ).outerjoin(
+        Lead,
+        Installation.lead_id == Lead.id
     ).filter(
         Technician.is_active == True
     ).all()
@@ -589,7 +491,7 @@ def get_all_technician_locations(db: Session = Depends(get_db)):
     now = datetime.now(timezone.utc)
     response = []
     
-    for location, technician in results:
+    for location, technician, installation_address, installation_status, lead_name in results:
         recorded_at = location.recorded_at
         if recorded_at.tzinfo is None:
             recorded_at = recorded_at.replace(tzinfo=timezone.utc)
@@ -597,15 +499,13 @@ def get_all_technician_locations(db: Session = Depends(get_db)):
         minutes_ago = int(time_diff.total_seconds() / 60)
         
         current_installation = None
-        if location.installation_id:
-            inst = db.query(Installation).filter(Installation.id == location.installation_id).first()
-            if inst:
-                current_installation = {
-                    "id": inst.id,
-                    "address": inst.address,
-                    "lead_name": inst.lead.name if inst.lead else "Sin nombre",
-                    "status": inst.status.value
-                }
+        if installation_status is not None:
+            current_installation = {
+                "id": location.installation_id,
+                "address": installation_address,
+                "lead_name": lead_name or "Sin nombre",
+                "status": installation_status
+            }
         
         response.append(TechnicianLocationResponse(
             technician_id=technician.id,
@@ -622,12 +522,21 @@ def get_all_technician_locations(db: Session = Depends(get_db)):
             current_installation=current_installation
         ))
     
-    return response
+    return json_response(_location_list_adapter.dump_json(response))
 
 
 @router.get("/locations/history/{technician_id}", response_model=List[LocationHistoryResponse])
 def get_technician_location_history(technician_id: int, date_filter: Optional[date] = None, limit: int = 100, db: Session = Depends(get_db)):
-    query = db.query(TechnicianLocation).filter(TechnicianLocation.technician_id == technician_id)
+    query = db.query(
+        TechnicianLocation.id,
+        TechnicianLocation.latitude,
+        TechnicianLocation.longitude,
+        TechnicianLocation.accuracy,
+        TechnicianLocation.speed,
+        TechnicianLocation.battery_level,
+        TechnicianLocation.activity,
+        TechnicianLocation.recorded_at
+    ).filter(TechnicianLocation.technician_id == technician_id)
     
     if date_filter:
         start_of_day = datetime.combine(date_filter, datetime.min.time())
@@ -639,13 +548,6 @@ def get_technician_location_history(technician_id: int, date_filter: Optional[da
     
     locations = query.order_by(TechnicianLocation.recorded_at.desc()).limit(limit).all()
     
-    return [LocationHistoryResponse(
-        id=loc.id,
-        latitude=loc.latitude,
-        longitude=loc.longitude,
-        accuracy=loc.accuracy,
-        speed=loc.speed,
-        battery_level=loc.battery_level,
-        activity=loc.activity,
-        recorded_at=loc.recorded_at
-    ) for loc in locations]
+    return json_response(_location_history_adapter.dump_json(
+        _location_history_adapter.validate_python(locations, from_attributes=True)
+    ))
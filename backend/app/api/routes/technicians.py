@@ -11,7 +11,8 @@ from app.schemas import (
     TechnicianCreate, TechnicianUpdate, TechnicianResponse, TechnicianListResponse,
     TechnicianDaySchedule, InstallationResponse
 )
-from app.models import User
+from app.models import User, Lead, Product, Technician as TechnicianModel
+from app.core.timezone import today_colombia
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -51,9 +52,6 @@ def get_technician_installations_for_app(
     No authentication required (for technician app).
     Returns installations with lead and product details.
     """
-    from app.core.timezone import today_colombia
-    from app.models import Lead, Product, Technician as TechnicianModel
-
     technician = crud.technician.get(db, id=technician_id)
     if not technician:
         raise HTTPException(
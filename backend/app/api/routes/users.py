@@ -50,7 +50,7 @@ class UserResponse(BaseModel):
 
 
 @router.get("/", response_model=List[UserResponse])
-async def get_users(
+def get_users(
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     db: Session = Depends(get_db),
@@ -79,7 +79,7 @@ async def get_users(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_db)):
     """Get a single user by ID."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -96,7 +96,7 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/", response_model=UserResponse)
-async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
+def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
     """Create a new user."""
     # Check if email already exists
     existing = db.query(User).filter(User.email == user_data.email).first()
@@ -139,7 +139,7 @@ async def create_user(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
@@ -197,7 +197,7 @@ async def update_user(
 
 
 @router.delete("/{user_id}")
-async def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int, db: Session = Depends(get_db)):
     """Delete a user (soft delete - sets is_active to False)."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
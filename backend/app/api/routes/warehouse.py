@@ -3,7 +3,7 @@ ZAFESYS Suite - Warehouse API Routes
 Endpoints for the Bodega app - managing order preparation and delivery.
 """
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from typing import Optional, List
 
 from fastapi import APIRouter, HTTPException, Depends, Query
@@ -82,7 +82,7 @@ class WarehouseLoginResponse(BaseModel):
 # ============== ENDPOINTS ==============
 
 @router.post("/login", response_model=WarehouseLoginResponse)
-async def warehouse_login(
+def warehouse_login(
     request: WarehouseLoginRequest,
     db: Session = Depends(get_db),
 ):
@@ -117,7 +117,6 @@ async def warehouse_login(
         )
 
     # Create access token
-    from datetime import timedelta
     access_token = create_access_token(
         subject=user.id,
         role=user_role,
@@ -138,7 +137,7 @@ async def warehouse_login(
     )
 
 @router.get("/users", response_model=List[WarehouseUser])
-async def get_warehouse_users(db: Session = Depends(get_db)):
+def get_warehouse_users(db: Session = Depends(get_db)):
     """Get list of users that can work in warehouse (admin and warehouse roles)."""
     logger.info("GET /warehouse/users called")
 
@@ -165,7 +164,7 @@ async def get_warehouse_users(db: Session = Depends(get_db)):
 
 
 @router.get("/orders", response_model=List[OrderResponse])
-async def get_warehouse_orders(
+def get_warehouse_orders(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     status: Optional[str] = Query(None, description="Filter by warehouse_status"),
@@ -256,7 +255,7 @@ async def get_warehouse_orders(
 
 
 @router.get("/orders/{installation_id}", response_model=OrderResponse)
-async def get_order_detail(
+def get_order_detail(
     installation_id: int,
     db: Session = Depends(get_db),
 ):
@@ -313,7 +312,7 @@ async def get_order_detail(
 
 
 @router.patch("/orders/{installation_id}/prepare", response_model=OrderResponse)
-async def mark_as_prepared(
+def mark_as_prepared(
     installation_id: int,
     request: UpdateStatusRequest,
     db: Session = Depends(get_db),
@@ -335,11 +334,11 @@ async def mark_as_prepared(
     logger.info(f"Order {installation_id} marked as prepared")
 
     # Return updated order
-    return await get_order_detail(installation_id, db)
+    return get_order_detail(installation_id, db)
 
 
 @router.patch("/orders/{installation_id}/deliver", response_model=OrderResponse)
-async def mark_as_delivered(
+def mark_as_delivered(
     installation_id: int,
     request: UpdateStatusRequest,
     db: Session = Depends(get_db),
@@ -361,7 +360,7 @@ async def mark_as_delivered(
     logger.info(f"Order {installation_id} marked as delivered")
 
     # Return updated order
-    return await get_order_detail(installation_id, db)
+    return get_order_detail(installation_id, db)
 
 
 logger.info("Warehouse router initialized")
@@ -3,6 +3,7 @@ ZAFESYS Suite - Webhook Routes
 ElevenLabs conversation webhook to create leads automatically
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.api.deps import get_db
 from app import crud
@@ -12,6 +13,7 @@ from app.config import settings
 import json
 import re
 import logging
+import uuid
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -199,6 +201,74 @@ def analyze_conversation(payload: ElevenLabsWebhookPayload) -> dict:
     return result
 
 
+def _store_conversation_lead(
+    db: Session,
+    payload: ElevenLabsWebhookPayload,
+    conversation_id: str,
+) -> dict:
+    """Create or update the lead for an ElevenLabs conversation (blocking DB work)."""
+    # Check if conversation already processed
+    existing = crud.lead.get_by_elevenlabs_conversation(db, conversation_id=conversation_id)
+    if existing:
+        logger.info(f"Conversation {conversation_id} already processed, lead ID: {existing.id}")
+        return {"status": "duplicate", "lead_id": existing.id}
+
+    # Analyze conversation
+    analysis = analyze_conversation(payload)
+    transcript_text = format_transcript(payload.get_transcript())
+
+    logger.info(f"Analysis result: {analysis}")
+    logger.info(f"Transcript length: {len(transcript_text)} chars")
+
+    # Check if we have minimum required data
+    if not analysis["phone"] and not analysis["name"]:
+        logger.warning(f"No customer data extracted from conversation {conversation_id}")
+        analysis["name"] = "Cliente sin identificar"
+        analysis["phone"] = f"pendiente-{conversation_id[:8]}"
+
+    # Check if lead with this phone already exists
+    if analysis["phone"] and not analysis["phone"].startswith("pendiente"):
+        existing_phone = crud.lead.get_by_phone(db, phone=analysis["phone"])
+        if existing_phone:
+            logger.info(f"Updating existing lead {existing_phone.id} with conversation data")
+            existing_phone.elevenlabs_conversation_id = conversation_id
+            existing_phone.conversation_transcript = transcript_text
+            if analysis["product_interest"]:
+                existing_phone.product_interest = analysis["product_interest"]
+            if analysis["notes"]:
+                existing_phone.notes = (existing_phone.notes or "") + f"\n[Ana] {analysis['notes']}"
+            if analysis["interest_level"] == "high" and existing_phone.status == LeadStatus.NUEVO:
+                existing_phone.status = LeadStatus.POTENCIAL
+            db.add(existing_phone)
+            db.commit()
+            db.refresh(existing_phone)
+            return {"status": "updated", "lead_id": existing_phone.id}
+
+    # Determine lead status
+    has_contact = bool(analysis["phone"] and not analysis["phone"].startswith("pendiente"))
+    lead_status = determine_lead_status(analysis["interest_level"], has_contact)
+
+    # Create new lead
+    lead = crud.lead.create_from_elevenlabs(
+        db,
+        conversation_id=conversation_id,
+        name=analysis["name"] or "Cliente de Ana",
+        phone=analysis["phone"] or f"pendiente-{conversation_id[:8]}",
+        email=analysis["email"],
+        address=analysis["address"],
+        product_interest=analysis["product_interest"],
+        transcript=transcript_text,
+        notes=analysis["notes"],
+        status=lead_status,
+        source=LeadSource.ANA_VOICE,
+    )
+
+    logger.info(f"Created new lead {lead.id} from conversation {conversation_id}")
+    logger.info("=" * 60)
+
+    return {"status": "created", "lead_id": lead.id}
+
+
 # ============================================================
 # WEBHOOK ENDPOINTS
 # ============================================================
@@ -273,73 +343,13 @@ async def elevenlabs_conversation_webhook(
         logger.error("No conversation_id found in payload")
         return {"status": "error", "message": "No conversation_id", "received": True}
 
-    # Check if conversation already processed
-    existing = crud.lead.get_by_elevenlabs_conversation(db, conversation_id=conversation_id)
-    if existing:
-        logger.info(f"Conversation {conversation_id} already processed, lead ID: {existing.id}")
-        return {"status": "duplicate", "lead_id": existing.id}
-
-    # Analyze conversation
-    analysis = analyze_conversation(payload)
-    transcript_text = format_transcript(payload.get_transcript())
-
-    logger.info(f"Analysis result: {analysis}")
-    logger.info(f"Transcript length: {len(transcript_text)} chars")
-
-    # Check if we have minimum required data
-    if not analysis["phone"] and not analysis["name"]:
-        logger.warning(f"No customer data extracted from conversation {conversation_id}")
-        analysis["name"] = "Cliente sin identificar"
-        analysis["phone"] = f"pendiente-{conversation_id[:8]}"
-
-    # Check if lead with this phone already exists
-    if analysis["phone"] and not analysis["phone"].startswith("pendiente"):
-        existing_phone = crud.lead.get_by_phone(db, phone=analysis["phone"])
-        if existing_phone:
-            logger.info(f"Updating existing lead {existing_phone.id} with conversation data")
-            existing_phone.elevenlabs_conversation_id = conversation_id
-            existing_phone.conversation_transcript = transcript_text
-            if analysis["product_interest"]:
-                existing_phone.product_interest = analysis["product_interest"]
-            if analysis["notes"]:
-                existing_phone.notes = (existing_phone.notes or "") + f"\n[Ana] {analysis['notes']}"
-            if analysis["interest_level"] == "high" and existing_phone.status == LeadStatus.NUEVO:
-                existing_phone.status = LeadStatus.POTENCIAL
-            db.add(existing_phone)
-            db.commit()
-            db.refresh(existing_phone)
-            return {"status": "updated", "lead_id": existing_phone.id}
-
-    # Determine lead status
-    has_contact = bool(analysis["phone"] and not analysis["phone"].startswith("pendiente"))
-    lead_status = determine_lead_status(analysis["interest_level"], has_contact)
-
-    # Create new lead
-    lead = crud.lead.create_from_elevenlabs(
-        db,
-        conversation_id=conversation_id,
-        name=analysis["name"] or "Cliente de Ana",
-        phone=analysis["phone"] or f"pendiente-{conversation_id[:8]}",
-        email=analysis["email"],
-        address=analysis["address"],
-        product_interest=analysis["product_interest"],
-        transcript=transcript_text,
-        notes=analysis["notes"],
-        status=lead_status,
-        source=LeadSource.ANA_VOICE,
-    )
-
-    logger.info(f"Created new lead {lead.id} from conversation {conversation_id}")
-    logger.info("=" * 60)
-
-    return {"status": "created", "lead_id": lead.id}
+    # Lead lookups/writes use the sync Session - keep them off the event loop
+    return await run_in_threadpool(_store_conversation_lead, db, payload, conversation_id)
 
 
 @router.post("/elevenlabs/test")
-async def test_elevenlabs_webhook(db: Session = Depends(get_db)):
+def test_elevenlabs_webhook(db: Session = Depends(get_db)):
     """Test endpoint to simulate ElevenLabs webhook."""
-    import uuid
-
     lead = crud.lead.create_from_elevenlabs(
         db,
         conversation_id=f"test-{uuid.uuid4()}",
@@ -0,0 +1,42 @@
+"""
+ZAFESYS Suite - In-Process Caches
+
+Small TTL caches for hot reads. Sync handlers run in worker threads, so each
+cache is guarded by a lock. Every worker process keeps its own copy: writes
+evict or clear the local entries, and the TTL bounds how long another
+worker's copy can lag behind.
+"""
+import threading
+from typing import Any, Callable, Hashable
+from cachetools import TTLCache
+
+
+class LocalCache:
+    """A lock-guarded TTLCache filled on demand."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.ttl = ttl
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        compute() runs outside the lock; a None result is returned but not cached.
+        """
+        with self._lock:
+            value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                with self._lock:
+                    self._cache[key] = value
+        return value
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._cache.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
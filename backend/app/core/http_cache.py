@@ -0,0 +1,32 @@
+"""
+ZAFESYS Suite - HTTP Conditional Request Helpers
+
+ETag / If-None-Match support for endpoints that dashboards and the
+technician app poll, so unchanged data costs a 304 instead of a full body,
+and a wrapper for bodies that are already serialized (cached or ETag'd).
+"""
+import hashlib
+from typing import Any, Optional
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a strong ETag from any values that identify a response version."""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest() + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set ETag on the response; return a bare 304 if the client already has this version."""
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=cache_headers)
+    response.headers.update(cache_headers)
+    return None
+
+
+def json_response(content: bytes, response: Optional[Response] = None) -> Response:
+    """Wrap pre-serialized JSON, carrying over headers set on the injected response."""
+    wrapped = Response(content=content, media_type="application/json")
+    if response is not None:
+        wrapped.headers.update(response.headers)
+    return wrapped
@@ -1,11 +1,15 @@
 """
 ZAFESYS Suite - Security / Authentication
 """
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional, Union
+from cryptography.fernet import Fernet, InvalidToken
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from sqlalchemy.types import Text, TypeDecorator
 from app.config import settings
+from app.core.cache import LocalCache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,13 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_pin(plain_pin: str, stored_pin: Optional[str]) -> bool:
+    """Compare a technician PIN against the stored one in constant time."""
+    if not stored_pin:
+        return False
+    return hmac.compare_digest(plain_pin.encode(), stored_pin.encode())
+
+
 def create_access_token(
     subject: Union[str, int],
     role: Optional[str] = None,
@@ -58,3 +69,51 @@ def decode_access_token(token: str) -> Optional[dict]:
     except JWTError as e:
         logger.error(f"JWT decode error: {e}")
         return None
+
+
+# ============== TOKEN ENCRYPTION AT REST ==============
+
+_fernet = Fernet(settings.TOKEN_ENCRYPTION_KEY) if settings.TOKEN_ENCRYPTION_KEY else None
+
+if _fernet is None:
+    logger.warning("TOKEN_ENCRYPTION_KEY not set - OAuth tokens and technician PINs are stored in plaintext")
+
+# Decrypted values by ciphertext, for columns read on hot paths (OAuth tokens).
+# The TTL bounds how long plaintext stays in process memory.
+_decrypted_cache = LocalCache(maxsize=64, ttl=300)
+
+
+def _decrypt_token(value: str) -> str:
+    """Decrypt a stored token."""
+    try:
+        return _fernet.decrypt(value.encode()).decode()
+    except InvalidToken:
+        # Legacy plaintext row - returned as-is and encrypted on next write
+        return value
+
+
+class EncryptedText(TypeDecorator):
+    """Text column stored Fernet-encrypted when TOKEN_ENCRYPTION_KEY is set.
+
+    cache_decrypted=False keeps the plaintext out of the decryption cache;
+    use it for credentials such as PINs.
+    """
+
+    impl = Text
+    cache_ok = True
+
+    def __init__(self, *args, cache_decrypted: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_decrypted = cache_decrypted
+
+    def process_bind_param(self, value, dialect):
+        if value is None or _fernet is None:
+            return value
+        return _fernet.encrypt(value.encode()).decode()
+
+    def process_result_value(self, value, dialect):
+        if value is None or _fernet is None:
+            return value
+        if self.cache_decrypted:
+            return _decrypted_cache.get_or_compute(value, lambda: _decrypt_token(value))
+        return _decrypt_token(value)
@@ -3,6 +3,7 @@ ZAFESYS Suite - Base CRUD Operations
 """
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from pydantic import BaseModel
+from sqlalchemy import delete, func, update
 from sqlalchemy.orm import Session
 from app.database import Base
 
@@ -31,11 +32,18 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         """Get multiple records with pagination."""
         return db.query(self.model).offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        """Create a new record."""
+    def create(self, db: Session, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
+        """Create a new record.
+
+        With commit=False the row is only flushed so the caller can batch
+        several writes into one transaction.
+        """
         obj_in_data = obj_in.model_dump()
         db_obj = self.model(**obj_in_data)
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
@@ -62,6 +70,54 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.refresh(db_obj)
         return db_obj
 
+    def commit_no_expire(self, db: Session) -> None:
+        """Commit without expiring loaded objects.
+
+        Rows just written with UPDATE ... RETURNING are already current, so
+        the usual expire-on-commit would only cost a reload SELECT when the
+        response is serialized.
+        """
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+
+    def update_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        values: Dict[str, Any],
+        where: tuple = (),
+        commit: bool = True
+    ) -> Optional[ModelType]:
+        """Single UPDATE ... WHERE id = :id RETURNING *.
+
+        Extra `where` criteria make the update conditional. Returns None
+        when no row matched.
+        """
+        if not values:
+            return self.get(db, id)
+        db_obj = db.scalars(
+            update(self.model)
+            .where(self.model.id == id, *where)
+            .values(**values)
+            .returning(self.model)
+        ).one_or_none()
+        if db_obj is not None and commit:
+            self.commit_no_expire(db)
+        return db_obj
+
+    def remove_by_id(self, db: Session, *, id: int) -> bool:
+        """Delete a record with a single DELETE. Returns False if it didn't exist."""
+        deleted_id = db.execute(
+            delete(self.model).where(self.model.id == id).returning(self.model.id)
+        ).scalar_one_or_none()
+        db.commit()
+        return deleted_id is not None
+
     def remove(self, db: Session, *, id: int) -> Optional[ModelType]:
         """Delete a record."""
         obj = db.query(self.model).filter(self.model.id == id).first()
@@ -70,6 +126,27 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             db.commit()
         return obj
 
+    def get_table_version(self, db: Session) -> tuple:
+        """
+        Cheap change marker for the whole table: (COUNT(*), SUM of created_at and
+        updated_at epochs).
+
+        Sums rather than MAX: updated_at is stamped with now(), the transaction
+        start time, so a write committed after a later-started one can land below
+        the current MAX and leave it unchanged. It still moves that row's
+        timestamp, which always shifts the sum.
+
+        No index serves these aggregates, so every call reads the whole table:
+        only use it where the response reads the whole table anyway.
+        """
+        return tuple(
+            db.query(
+                func.count(self.model.id),
+                func.sum(func.extract("epoch", self.model.created_at)),
+                func.sum(func.extract("epoch", self.model.updated_at))
+            ).one()
+        )
+
     def count(self, db: Session) -> int:
         """Count all records."""
         return db.query(self.model).count()
@@ -1,18 +1,83 @@
 """
 ZAFESYS Suite - Installation CRUD Operations
 """
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple, Union
 from datetime import date, datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import Float, Integer, String, case, cast, func, literal, literal_column, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
 from app.crud.base import CRUDBase
-from app.models import Installation, InstallationStatus, PaymentStatus
-from app.schemas import InstallationCreate, InstallationUpdate
+from app.models import Installation, InstallationStatus, Lead, PaymentStatus, Product
+from app.schemas import InstallationCreate, InstallationUpdate, InstallationResponse
 from app.core.timezone import now_colombia, today_colombia, COLOMBIA_TZ
 
 
+# Listing queries select just the columns InstallationResponse reads, as plain
+# rows: no identity map or instance-state bookkeeping per row
+_RESPONSE_COLUMNS = tuple(getattr(Installation, name) for name in InstallationResponse.model_fields)
+
+
+# Technician app cards: installation columns plus lead/product display fields,
+# labelled as TechInstallationResponse names and joined in the same SELECT. Values
+# come out already in the response's types, so callers can skip validation
+_TECH_APP_COLUMNS = (
+    Installation.id,
+    func.coalesce(Lead.name, "Sin nombre").label("lead_name"),
+    func.coalesce(Lead.phone, "").label("lead_phone"),
+    func.coalesce(Product.name, "Sin producto").label("product_name"),
+    func.coalesce(Product.model, "").label("product_model"),
+    Product.image_url.label("product_image"),
+    Installation.scheduled_date,
+    cast(Installation.scheduled_time, String).label("scheduled_time"),
+    Installation.address,
+    Installation.city,
+    Installation.address_notes,
+    Installation.status,
+    Installation.payment_status,
+    cast(Installation.total_price, Float).label("total_price"),
+    cast(func.coalesce(Installation.amount_paid, 0), Float).label("amount_paid"),
+    Installation.customer_notes,
+    Installation.timer_started_at,
+    Installation.timer_ended_at,
+    Installation.timer_started_by,
+    Installation.installation_duration_minutes,
+    Installation.signature_url,
+    Installation.photos_before,
+    Installation.photos_after,
+    Installation.video_url,
+)
+
+
+def _tech_app_select():
+    return (
+        select(*_TECH_APP_COLUMNS)
+        .outerjoin(Lead, Installation.lead_id == Lead.id)
+        .outerjoin(Product, Installation.product_id == Product.id)
+    )
+
+
+def _jsonb_append(column, items: List[str]):
+    """SQL expression appending items to a JSONB array column (NULL counts as [])."""
+    return func.coalesce(column, literal_column("'[]'::jsonb")).op("||")(literal(items, JSONB))
+
+
 class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUpdate]):
     """CRUD operations for Installation model."""
 
+    def get_updated_at(self, db: Session, *, id: int) -> Optional[Row]:
+        """Select just (updated_at,) for an installation; None if it doesn't exist."""
+        return db.query(Installation.updated_at).filter(Installation.id == id).first()
+
+    def get_with_lead(self, db: Session, *, id: int) -> Optional[Installation]:
+        """Get an installation with its lead in one JOINed SELECT."""
+        return (
+            db.query(Installation)
+            .options(joinedload(Installation.lead))
+            .filter(Installation.id == id)
+            .first()
+        )
+
     def get_by_lead(
         self,
         db: Session,
@@ -51,9 +116,14 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         *,
         target_date: date,
         technician_id: Optional[int] = None
-    ) -> List[Installation]:
-        """Get installations scheduled for a specific date."""
-        query = db.query(Installation).filter(Installation.scheduled_date == target_date)
+    ) -> List[Row]:
+        """
+        Get installations scheduled for a specific date, as InstallationResponse column rows.
+        Without a technician the statement has no technician predicate at all
+        (not `technician_id IS NULL`), so it can walk (scheduled_date, scheduled_time)
+        in order; with one it uses (scheduled_date, technician_id).
+        """
+        query = db.query(*_RESPONSE_COLUMNS).filter(Installation.scheduled_date == target_date)
         if technician_id:
             query = query.filter(Installation.technician_id == technician_id)
         return query.order_by(Installation.scheduled_time).all()
@@ -80,10 +150,85 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
             .all()
         )
 
-    def get_pending(self, db: Session) -> List[Installation]:
-        """Get installations pending scheduling."""
+    def get_tech_app_day(
+        self,
+        db: Session,
+        *,
+        technician_id: int,
+        target_date: date
+    ) -> List[Row]:
+        """Technician app cards for a day's open installations, as plain rows."""
+        return db.execute(
+            _tech_app_select()
+            .where(
+                Installation.technician_id == technician_id,
+                Installation.scheduled_date == target_date,
+                Installation.status.notin_([
+                    InstallationStatus.CANCELADA.value,
+                    InstallationStatus.COMPLETADA.value
+                ])
+            )
+            .order_by(Installation.scheduled_time)
+        ).all()
+
+    def get_tech_app_card(self, db: Session, *, id: int, technician_id: int) -> Optional[Row]:
+        """One technician app card; None if missing or assigned to someone else."""
+        return db.execute(
+            _tech_app_select()
+            .where(Installation.id == id, Installation.technician_id == technician_id)
+        ).first()
+
+    def get_page(
+        self,
+        db: Session,
+        *,
+        status: Optional[InstallationStatus] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[Row]:
+        """
+        Keyset page ordered by (created_at DESC, id DESC), as InstallationResponse column rows.
+        `after` is the (created_at, id) of the last row of the previous page;
+        `skip` is the legacy offset and still scans the skipped rows.
+        """
+        query = db.query(*_RESPONSE_COLUMNS)
+        if status:
+            query = query.filter(Installation.status == status.value)
+        if after:
+            query = query.filter(tuple_(Installation.created_at, Installation.id) < after)
         return (
-            db.query(Installation)
+            query
+            .order_by(Installation.created_at.desc(), Installation.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+
+    def iter_all(
+        self,
+        db: Session,
+        *,
+        status: Optional[InstallationStatus] = None,
+        batch_size: int = 500
+    ) -> Iterator[Installation]:
+        """
+        Iterate installations newest first without loading them all.
+        Rows come from a server-side cursor `batch_size` at a time.
+        """
+        query = db.query(Installation)
+        if status:
+            query = query.filter(Installation.status == status.value)
+        return iter(
+            query
+            .order_by(Installation.created_at.desc(), Installation.id.desc())
+            .yield_per(batch_size)
+        )
+
+    def get_pending(self, db: Session) -> List[Row]:
+        """Get installations pending scheduling, as InstallationResponse column rows."""
+        return (
+            db.query(*_RESPONSE_COLUMNS)
             .filter(Installation.status == InstallationStatus.PENDIENTE.value)
             .order_by(Installation.created_at)
             .all()
@@ -115,13 +260,7 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         status: InstallationStatus
     ) -> Installation:
         """Update installation status."""
-        db_obj.status = status.value
-        if status == InstallationStatus.COMPLETADA:
-            db_obj.completed_at = now_colombia()
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.update_status_by_id(db, id=db_obj.id, status=status) or db_obj
 
     def update_payment(
         self,
@@ -133,15 +272,13 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         amount_paid: Optional[float] = None
     ) -> Installation:
         """Update installation payment info."""
-        db_obj.payment_status = payment_status.value
-        if payment_method:
-            db_obj.payment_method = payment_method
-        if amount_paid is not None:
-            db_obj.amount_paid = amount_paid
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        return self.update_payment_by_id(
+            db,
+            id=db_obj.id,
+            payment_status=payment_status,
+            payment_method=payment_method,
+            amount_paid=amount_paid
+        ) or db_obj
 
     def complete(
         self,
@@ -152,16 +289,159 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         photo_proof_url: Optional[str] = None
     ) -> Installation:
         """Mark installation as completed."""
-        db_obj.status = InstallationStatus.COMPLETADA.value
-        db_obj.completed_at = now_colombia()
+        return self.complete_by_id(
+            db,
+            id=db_obj.id,
+            technician_notes=technician_notes,
+            photo_proof_url=photo_proof_url
+        ) or db_obj
+
+    def update_status_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        status: InstallationStatus,
+        technician_id: Optional[int] = None,
+        commit: bool = True
+    ) -> Optional[Installation]:
+        """
+        Update installation status in one UPDATE ... RETURNING. None if not found
+        or (when technician_id is given) assigned to another technician.
+        """
+        values = {"status": status.value}
+        if status == InstallationStatus.COMPLETADA:
+            values["completed_at"] = now_colombia()
+        where = (Installation.technician_id == technician_id,) if technician_id is not None else ()
+        return self.update_by_id(db, id=id, values=values, where=where, commit=commit)
+
+    def update_payment_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        payment_status: PaymentStatus,
+        payment_method: Optional[str] = None,
+        amount_paid: Optional[float] = None
+    ) -> Optional[Installation]:
+        """Update installation payment info in one UPDATE ... RETURNING."""
+        values = {"payment_status": payment_status.value}
+        if payment_method:
+            values["payment_method"] = payment_method
+        if amount_paid is not None:
+            values["amount_paid"] = amount_paid
+        return self.update_by_id(db, id=id, values=values)
+
+    def add_payment_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        amount: float,
+        payment_method: Optional[str] = None,
+        technician_id: Optional[int] = None
+    ) -> Optional[Installation]:
+        """
+        Add a payment and recompute payment_status in one UPDATE ... RETURNING,
+        so concurrent payments can't lose an increment. Returns None if the
+        installation doesn't exist or (when technician_id is given) belongs
+        to another technician.
+        """
+        new_paid = func.coalesce(Installation.amount_paid, 0) + amount
+        values = {
+            "amount_paid": new_paid,
+            "payment_status": case(
+                (new_paid >= Installation.total_price, PaymentStatus.PAGADO.value),
+                (new_paid > 0, PaymentStatus.PARCIAL.value),
+                else_=Installation.payment_status
+            ),
+        }
+        if payment_method:
+            values["payment_method"] = payment_method
+        where = (Installation.technician_id == technician_id,) if technician_id is not None else ()
+        return self.update_by_id(db, id=id, values=values, where=where)
+
+    def complete_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        technician_notes: Optional[str] = None,
+        photo_proof_url: Optional[str] = None,
+        commit: bool = True
+    ) -> Optional[Installation]:
+        """Mark installation as completed in one UPDATE ... RETURNING."""
+        values = {
+            "status": InstallationStatus.COMPLETADA.value,
+            "completed_at": now_colombia(),
+        }
         if technician_notes:
-            db_obj.technician_notes = technician_notes
+            values["technician_notes"] = technician_notes
         if photo_proof_url:
-            db_obj.photo_proof_url = photo_proof_url
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+            values["photo_proof_url"] = photo_proof_url
+        return self.update_by_id(db, id=id, values=values, commit=commit)
+
+    def save_media(
+        self,
+        db: Session,
+        *,
+        id: int,
+        signature_url: Optional[str] = None,
+        photos_before: Optional[List[str]] = None,
+        photos_after: Optional[List[str]] = None,
+        video_url: Optional[str] = None
+    ) -> Optional[Installation]:
+        """
+        Save media references in one UPDATE ... RETURNING.
+        Photo URLs are appended inside Postgres (jsonb ||), so concurrent
+        uploads for the same installation don't overwrite each other.
+        """
+        values = {}
+        if signature_url is not None:
+            values["signature_url"] = signature_url
+        if photos_before is not None:
+            values["photos_before"] = _jsonb_append(Installation.photos_before, photos_before)
+        if photos_after is not None:
+            values["photos_after"] = _jsonb_append(Installation.photos_after, photos_after)
+        if video_url is not None:
+            values["video_url"] = video_url
+        return self.update_by_id(db, id=id, values=values)
+
+    def start_timer_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        started_by: str  # 'admin' or 'technician'
+    ) -> Optional[Installation]:
+        """
+        Start the timer in one conditional UPDATE (restarts a stopped timer).
+        Returns None if the installation doesn't exist or its timer is already running.
+        """
+        return self.update_by_id(
+            db,
+            id=id,
+            values={
+                "timer_started_at": now_colombia(),
+                "timer_ended_at": None,  # Reset end time in case of restart
+                "timer_started_by": started_by,
+                "installation_duration_minutes": None,  # Reset duration
+                # Move to EN_PROGRESO unless already there or completed
+                "status": case(
+                    (
+                        Installation.status.in_([
+                            InstallationStatus.EN_PROGRESO.value,
+                            InstallationStatus.COMPLETADA.value
+                        ]),
+                        Installation.status
+                    ),
+                    else_=InstallationStatus.EN_PROGRESO.value
+                ),
+            },
+            where=(
+                or_(Installation.timer_started_at.is_(None), Installation.timer_ended_at.isnot(None)),
+            ),
+        )
 
     def start_timer(
         self,
@@ -175,19 +455,7 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         Can be started by admin or technician.
         If timer is already running, this is a no-op.
         """
-        # Only start if not already running
-        if db_obj.timer_started_at is None or db_obj.timer_ended_at is not None:
-            db_obj.timer_started_at = now_colombia()
-            db_obj.timer_ended_at = None  # Reset end time in case of restart
-            db_obj.timer_started_by = started_by
-            db_obj.installation_duration_minutes = None  # Reset duration
-            # Also update status to EN_PROGRESO if not already
-            if db_obj.status not in [InstallationStatus.EN_PROGRESO.value, InstallationStatus.COMPLETADA.value]:
-                db_obj.status = InstallationStatus.EN_PROGRESO.value
-            db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
-        return db_obj
+        return self.start_timer_by_id(db, id=db_obj.id, started_by=started_by) or db_obj
 
     def stop_timer(
         self,
@@ -197,32 +465,69 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
     ) -> Installation:
         """
         Stop the installation timer and calculate duration.
+        If the timer isn't running, this is a no-op.
+        """
+        return self.try_stop_timer(db, id=db_obj.id) or db_obj
+
+    def try_stop_timer(
+        self,
+        db: Session,
+        *,
+        id: int,
+        technician_id: Optional[int] = None
+    ) -> Optional[Installation]:
+        """
+        Stop a running timer and store its duration in one conditional UPDATE.
+        Returns None if the installation doesn't exist, its timer isn't running
+        or (when technician_id is given) it belongs to another technician,
+        so two concurrent stops can't both succeed.
         """
-        if db_obj.timer_started_at is not None and db_obj.timer_ended_at is None:
-            db_obj.timer_ended_at = now_colombia()
-            # Calculate duration in minutes
-            if db_obj.timer_started_at:
-                # Ensure both datetimes are timezone-aware for accurate calculation
-                started = db_obj.timer_started_at
-                ended = db_obj.timer_ended_at
-                if started.tzinfo is None:
-                    started = started.replace(tzinfo=COLOMBIA_TZ)
-                if ended.tzinfo is None:
-                    ended = ended.replace(tzinfo=COLOMBIA_TZ)
-                delta = ended - started
-                db_obj.installation_duration_minutes = int(delta.total_seconds() / 60)
-            db.add(db_obj)
-            db.commit()
-            db.refresh(db_obj)
-        return db_obj
+        where = (
+            Installation.timer_started_at.isnot(None),
+            Installation.timer_ended_at.is_(None),
+        )
+        if technician_id is not None:
+            where += (Installation.technician_id == technician_id,)
+        ended = now_colombia()
+        return self.update_by_id(
+            db,
+            id=id,
+            values={
+                "timer_ended_at": ended,
+                "installation_duration_minutes": cast(
+                    func.floor(func.extract("epoch", ended - Installation.timer_started_at) / 60),
+                    Integer
+                ),
+            },
+            where=where,
+        )
+
+    def get_timer_fields(self, db: Session, *, id: int) -> Optional[Row]:
+        """
+        Select only the timer columns for an installation (no full ORM load).
+        The row can be passed straight to get_timer_status.
+        """
+        return (
+            db.query(
+                Installation.id,
+                Installation.timer_started_at,
+                Installation.timer_ended_at,
+                Installation.timer_started_by,
+                Installation.installation_duration_minutes
+            )
+            .filter(Installation.id == id)
+            .first()
+        )
 
     def get_timer_status(
         self,
-        db_obj: Installation
+        db_obj: Union[Installation, Row]
     ) -> dict:
         """
         Get current timer status for an installation.
         Returns dict with timer info and current elapsed time if running.
+        Accepts an Installation or a get_timer_fields row; elapsed time is
+        computed in Python, no query is issued.
         """
         is_running = (
             db_obj.timer_started_at is not None and 
@@ -248,16 +553,33 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         }
 
     def count_by_status(self, db: Session) -> dict:
-        """Count installations by status."""
-        counts = {}
-        for status in InstallationStatus:
-            counts[status.value] = (
-                db.query(Installation)
-                .filter(Installation.status == status.value)
-                .count()
-            )
+        """Count installations by status (one GROUP BY instead of a query per status)."""
+        counts = {status.value: 0 for status in InstallationStatus}
+        rows = (
+            db.query(Installation.status, func.count(Installation.id))
+            .group_by(Installation.status)
+            .all()
+        )
+        for status, count in rows:
+            if status in counts:
+                counts[status] = count
         return counts
 
+    def get_stats_bundle(self, db: Session) -> dict:
+        """
+        Status counts and today's count in one query.
+        Uses conditional aggregation (COUNT(*) FILTER (WHERE ...)) over a single scan.
+        """
+        statuses = [status.value for status in InstallationStatus]
+        row = db.query(
+            *(func.count(Installation.id).filter(Installation.status == value) for value in statuses),
+            func.count(Installation.id).filter(Installation.scheduled_date == today_colombia()),
+        ).one()
+        return {
+            "by_status": dict(zip(statuses, row[:-1])),
+            "today_count": row[-1],
+        }
+
     def get_today_count(self, db: Session) -> int:
         """Get count of today's installations (Colombia timezone)."""
         today = today_colombia()
@@ -277,9 +599,8 @@ class CRUDInstallation(CRUDBase[Installation, InstallationCreate, InstallationUp
         Calculate average installation duration for a technician.
         Only considers completed installations with timer data.
         """
-        from sqlalchemy import func as sql_func
         result = (
-            db.query(sql_func.avg(Installation.installation_duration_minutes))
+            db.query(func.avg(Installation.installation_duration_minutes))
             .filter(
                 Installation.technician_id == technician_id,
                 Installation.installation_duration_minutes.isnot(None)
@@ -3,6 +3,7 @@ ZAFESYS Suite - Lead CRUD Operations
 """
 from typing import List, Optional
 from datetime import datetime
+from sqlalchemy import func, update
 from sqlalchemy.orm import Session
 from app.crud.base import CRUDBase
 from app.models import Lead, LeadStatus, LeadSource
@@ -35,11 +36,22 @@ class CRUDLead(CRUDBase[Lead, LeadCreate, LeadUpdate]):
         )
 
     def get_kanban_data(self, db: Session) -> dict:
-        """Get leads organized by status for kanban board."""
-        leads = db.query(Lead).order_by(Lead.created_at.desc()).all()
+        """Get leads organized by status for kanban board.
+
+        One SELECT of just the card columns, already grouped by status, so
+        wide columns like conversation_transcript never leave the database.
+        """
+        rows = (
+            db.query(
+                Lead.id, Lead.name, Lead.phone, Lead.status,
+                Lead.source, Lead.product_interest, Lead.created_at
+            )
+            .order_by(Lead.status, Lead.created_at.desc())
+            .all()
+        )
         kanban = {status.value: [] for status in LeadStatus}
-        for lead in leads:
-            kanban[lead.status].append(lead)
+        for row in rows:
+            kanban[row.status].append(row)
         return kanban
 
     def update_status(
@@ -47,17 +59,41 @@ class CRUDLead(CRUDBase[Lead, LeadCreate, LeadUpdate]):
         db: Session,
         *,
         db_obj: Lead,
-        status: LeadStatus
+        status: LeadStatus,
+        commit: bool = True
     ) -> Lead:
-        """Update lead status."""
+        """Update lead status. commit=False only flushes, for batched writes."""
         db_obj.status = status.value
         if status == LeadStatus.EN_CONVERSACION and not db_obj.contacted_at:
             db_obj.contacted_at = datetime.utcnow()
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def update_status_by_id(
+        self,
+        db: Session,
+        *,
+        id: int,
+        status: LeadStatus,
+        commit: bool = True
+    ) -> bool:
+        """
+        Update lead status with a single UPDATE, without loading the lead.
+        Returns False if the lead doesn't exist.
+        """
+        values = {"status": status.value}
+        if status == LeadStatus.EN_CONVERSACION:
+            values["contacted_at"] = func.coalesce(Lead.contacted_at, datetime.utcnow())
+        result = db.execute(update(Lead).where(Lead.id == id).values(**values))
+        if commit:
+            db.commit()
+        return result.rowcount > 0
+
     def get_by_elevenlabs_conversation(
         self,
         db: Session,
@@ -105,14 +141,16 @@ class CRUDLead(CRUDBase[Lead, LeadCreate, LeadUpdate]):
         return db_obj
 
     def count_by_status(self, db: Session) -> dict:
-        """Count leads by status."""
-        counts = {}
-        for status in LeadStatus:
-            counts[status.value] = (
-                db.query(Lead)
-                .filter(Lead.status == status.value)
-                .count()
-            )
+        """Count leads by status (one GROUP BY instead of a query per status)."""
+        counts = {status.value: 0 for status in LeadStatus}
+        rows = (
+            db.query(Lead.status, func.count(Lead.id))
+            .group_by(Lead.status)
+            .all()
+        )
+        for status, count in rows:
+            if status in counts:
+                counts[status] = count
         return counts
 
 
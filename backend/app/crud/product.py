@@ -1,12 +1,17 @@
 """
 ZAFESYS Suite - Product CRUD Operations
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
+from sqlalchemy import tuple_, update
 from sqlalchemy.orm import Session
+from app.core.cache import LocalCache
 from app.crud.base import CRUDBase
 from app.models import Product
 from app.schemas import ProductCreate, ProductUpdate
 
+# Display fields read on every technician-app installation view; update() evicts.
+_summary_cache = LocalCache(maxsize=1024, ttl=300)
+
 
 class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
     """CRUD operations for Product model."""
@@ -19,18 +24,49 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         """Get product by model name."""
         return db.query(Product).filter(Product.model == model).first()
 
+    def get_summary_cached(self, db: Session, *, id: int) -> Optional[Dict[str, Any]]:
+        """Get a product's name, model and image_url, cached in-process."""
+        def load() -> Optional[Dict[str, Any]]:
+            row = (
+                db.query(Product.name, Product.model, Product.image_url)
+                .filter(Product.id == id)
+                .first()
+            )
+            return row._asdict() if row is not None else None
+
+        return _summary_cache.get_or_compute(id, load)
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Product,
+        obj_in: Union[ProductUpdate, Dict[str, Any]]
+    ) -> Product:
+        """Update a product and drop its cached summary."""
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        _summary_cache.pop(db_obj.id)
+        return db_obj
+
     def get_active(
         self,
         db: Session,
         *,
+        after: Optional[Tuple[str, int]] = None,
         skip: int = 0,
         limit: int = 100
     ) -> List[Product]:
-        """Get only active products."""
+        """
+        Get only active products, keyset-paged by (name, id).
+        `after` is the (name, id) of the last row of the previous page;
+        `skip` is the legacy offset and still scans the skipped rows.
+        """
+        query = db.query(Product).filter(Product.is_active == True)
+        if after:
+            query = query.filter(tuple_(Product.name, Product.id) > after)
         return (
-            db.query(Product)
-            .filter(Product.is_active == True)
-            .order_by(Product.name)
+            query
+            .order_by(Product.name, Product.id)
             .offset(skip)
             .limit(limit)
             .all()
@@ -51,12 +87,14 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
         *,
         db_obj: Product,
         quantity: int,
-        operation: str = "set"
+        operation: str = "set",
+        commit: bool = True
     ) -> Product:
         """Update product stock.
 
         Args:
             operation: "set" to set absolute value, "add" to add, "subtract" to subtract
+            commit: False to only flush, leaving the commit to the caller
         """
         if operation == "set":
             db_obj.stock = quantity
@@ -66,10 +104,26 @@ class CRUDProduct(CRUDBase[Product, ProductCreate, ProductUpdate]):
             db_obj.stock = max(0, db_obj.stock - quantity)
 
         db.add(db_obj)
+        if not commit:
+            db.flush()
+            return db_obj
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def decrement_stock_atomic(self, db: Session, *, product_id: int, quantity: int) -> Optional[int]:
+        """Subtract stock only if enough is available, in a single UPDATE.
+
+        Returns the new stock, or None if the product is missing or short.
+        Not committed - the caller owns the transaction.
+        """
+        return db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .returning(Product.stock)
+        ).scalar_one_or_none()
+
     def search(
         self,
         db: Session,
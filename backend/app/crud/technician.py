@@ -1,16 +1,46 @@
 """
 ZAFESYS Suite - Technician CRUD Operations
 """
-from typing import List, Optional
+import re
+from typing import Any, Dict, List, Optional, Union
 from sqlalchemy.orm import Session
+from app.core.cache import LocalCache
 from app.crud.base import CRUDBase
 from app.models import Technician
 from app.schemas import TechnicianCreate, TechnicianUpdate
 
+# Names shown on technician-app installation views; update()/remove() evict.
+_name_cache = LocalCache(maxsize=1024, ttl=300)
+
+_NON_DIGITS = re.compile(r"\D+")
+
 
 class CRUDTechnician(CRUDBase[Technician, TechnicianCreate, TechnicianUpdate]):
     """CRUD operations for Technician model."""
 
+    def get_name_cached(self, db: Session, *, id: int) -> Optional[str]:
+        """Get a technician's full name, cached in-process."""
+        return _name_cache.get_or_compute(
+            id, lambda: db.query(Technician.full_name).filter(Technician.id == id).scalar()
+        )
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Technician,
+        obj_in: Union[TechnicianUpdate, Dict[str, Any]]
+    ) -> Technician:
+        """Update a technician and drop the cached name."""
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        _name_cache.pop(db_obj.id)
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Optional[Technician]:
+        """Delete a technician and drop the cached name."""
+        _name_cache.pop(id)
+        return super().remove(db, id=id)
+
     def get_by_user_id(self, db: Session, *, user_id: int) -> Optional[Technician]:
         """Get technician by user account ID."""
         return db.query(Technician).filter(Technician.user_id == user_id).first()
@@ -19,6 +49,22 @@ class CRUDTechnician(CRUDBase[Technician, TechnicianCreate, TechnicianUpdate]):
         """Get technician by phone number."""
         return db.query(Technician).filter(Technician.phone == phone).first()
 
+    def get_by_phone_digits(self, db: Session, *, phone: str) -> Optional[Technician]:
+        """Get a technician whose phone matches ignoring formatting, active ones first.
+
+        Compares digits only, with or without the +57 country code.
+        """
+        digits = _NON_DIGITS.sub("", phone)
+        local = digits[2:] if digits.startswith("57") and len(digits) > 10 else digits
+        if not local:
+            return None
+        return (
+            db.query(Technician)
+            .filter(Technician.phone_digits.in_((local, "57" + local)))
+            .order_by(Technician.is_active.desc())
+            .first()
+        )
+
     def get_active(
         self,
         db: Session,
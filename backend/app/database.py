@@ -8,8 +8,11 @@ from app.config import settings
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    query_cache_size=settings.DB_QUERY_CACHE_SIZE
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -5,12 +5,14 @@ Version: 1.2.0 - Added users management API
 """
 import logging
 from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from app.config import settings
-from app.api.routes import api_router
+from app.api.routes import api_router, google_ads
 from app.database import engine
 
 # Configure logging
@@ -114,9 +116,15 @@ def run_migrations():
             recorded_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
         );
         """,
-        "CREATE INDEX IF NOT EXISTS idx_tech_locations_technician ON technician_locations(technician_id);",
-        "CREATE INDEX IF NOT EXISTS idx_tech_locations_recorded_at ON technician_locations(recorded_at);",
         "CREATE INDEX IF NOT EXISTS idx_tech_locations_tech_time ON technician_locations(technician_id, recorded_at DESC);",
+        # Append-only GPS stream: every read is per technician, which tech_time above covers
+        # (technician_id alone is its prefix). Time ranges get a tiny BRIN instead of
+        # B-trees that every insert has to maintain
+        "DROP INDEX IF EXISTS idx_tech_locations_technician;",
+        "DROP INDEX IF EXISTS ix_technician_locations_technician_id;",
+        "DROP INDEX IF EXISTS idx_tech_locations_recorded_at;",
+        "DROP INDEX IF EXISTS ix_technician_locations_recorded_at;",
+        "CREATE INDEX IF NOT EXISTS idx_tech_locations_recorded_at_brin ON technician_locations USING brin (recorded_at) WITH (pages_per_range = 32);",
         
         # Installation Timer columns - for tracking actual installation duration
         "ALTER TABLE installations ADD COLUMN IF NOT EXISTS timer_started_at TIMESTAMP WITH TIME ZONE;",
@@ -162,6 +170,7 @@ def run_migrations():
         );
         """,
         "CREATE INDEX IF NOT EXISTS idx_google_ads_accounts_slot ON google_ads_accounts(account_slot);",
+        "ALTER TABLE google_ads_accounts ADD COLUMN IF NOT EXISTS is_manager BOOLEAN DEFAULT FALSE;",
 
         # Warehouse/Bodega app columns for installations
         "ALTER TABLE installations ADD COLUMN IF NOT EXISTS warehouse_status VARCHAR(30) DEFAULT 'pendiente';",
@@ -172,6 +181,60 @@ def run_migrations():
 
         # Convert users.role to VARCHAR to support warehouse role
         "ALTER TABLE users ALTER COLUMN role TYPE VARCHAR(30) USING role::text;",
+
+        # Reporting indexes
+        "CREATE INDEX IF NOT EXISTS idx_installations_status_completed_at ON installations(status, completed_at);",
+        "CREATE INDEX IF NOT EXISTS idx_installations_created_at_id ON installations(created_at, id);",
+        "CREATE INDEX IF NOT EXISTS idx_installations_status_created_at ON installations(status, created_at DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_installations_date_technician ON installations(scheduled_date, technician_id);",
+        "CREATE INDEX IF NOT EXISTS idx_installations_date_time ON installations(scheduled_date, scheduled_time);",
+
+        # Photo URL arrays as JSONB (appended server-side); only converts while still TEXT
+        """
+        DO $$
+        BEGIN
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_name = 'installations' AND column_name = 'photos_before') = 'text' THEN
+                -- Anything that isn't a JSON array would abort the cast; drop it
+                UPDATE installations SET photos_before = NULL
+                    WHERE photos_before !~ '^[[:space:]]*[[].*[]][[:space:]]*$';
+                UPDATE installations SET photos_after = NULL
+                    WHERE photos_after !~ '^[[:space:]]*[[].*[]][[:space:]]*$';
+                ALTER TABLE installations
+                    ALTER COLUMN photos_before TYPE JSONB USING NULLIF(photos_before, '')::jsonb,
+                    ALTER COLUMN photos_after TYPE JSONB USING NULLIF(photos_after, '')::jsonb;
+            END IF;
+        END $$;
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_installations_pending ON installations(created_at) WHERE status = 'pendiente';",
+        # Analytics/status pages filter one status over a scheduled_date range; lead_id is an unindexed FK
+        "CREATE INDEX IF NOT EXISTS idx_installations_status_scheduled_date ON installations(status, scheduled_date DESC);",
+        "CREATE INDEX IF NOT EXISTS idx_installations_lead_id ON installations(lead_id);",
+        # Technician day schedule (ordered by time) and per-technician history (ordered by date)
+        "CREATE INDEX IF NOT EXISTS idx_installations_technician_date_time ON installations(technician_id, scheduled_date, scheduled_time);",
+        # Technician app login: exact phone lookup, then digits-only fallback
+        "CREATE INDEX IF NOT EXISTS idx_technicians_phone ON technicians(phone);",
+        "ALTER TABLE technicians ADD COLUMN IF NOT EXISTS phone_digits VARCHAR(20) GENERATED ALWAYS AS (regexp_replace(phone, '[^0-9]', '', 'g')) STORED;",
+        "CREATE INDEX IF NOT EXISTS idx_technicians_phone_digits ON technicians(phone_digits);",
+        # PINs are stored Fernet-encrypted, which no longer fits VARCHAR(6)
+        """
+        DO $$
+        BEGIN
+            IF (SELECT data_type FROM information_schema.columns
+                WHERE table_name = 'technicians' AND column_name = 'pin') = 'character varying' THEN
+                ALTER TABLE technicians ALTER COLUMN pin TYPE TEXT;
+            END IF;
+        END $$;
+        """,
+        # Product search is ILIKE '%q%' on name/model/sku - only trigram GIN indexes can serve it
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+        "CREATE INDEX IF NOT EXISTS idx_products_name_trgm ON products USING gin (name gin_trgm_ops);",
+        "CREATE INDEX IF NOT EXISTS idx_products_model_trgm ON products USING gin (model gin_trgm_ops);",
+        "CREATE INDEX IF NOT EXISTS idx_products_sku_trgm ON products USING gin (sku gin_trgm_ops);",
+        # get_active keyset-pages active products by (name, id); low-stock is a tiny slice of the catalogue
+        "DROP INDEX IF EXISTS idx_products_active_name;",
+        "CREATE INDEX IF NOT EXISTS idx_products_active_name_id ON products(name, id) WHERE is_active = true;",
+        "CREATE INDEX IF NOT EXISTS idx_products_low_stock ON products(id) WHERE is_active = true AND stock <= min_stock_alert;",
     ]
     
     with engine.connect() as conn:
@@ -181,6 +244,8 @@ def run_migrations():
                 conn.commit()
                 logger.info(f"Migration executed: {migration[:50]}...")
             except Exception as e:
+                # Clear the aborted transaction so the next statement can run
+                conn.rollback()
                 logger.warning(f"Migration skipped (may already exist): {e}")
 
 
@@ -188,6 +253,8 @@ def run_migrations():
 async def lifespan(app: FastAPI):
     """Startup and shutdown events."""
     # Startup
+    # Sync handlers run in anyio's worker threads (40 by default) - widen the pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_MAX_WORKERS
     logger.info("Running database migrations...")
     try:
         run_migrations()
@@ -197,6 +264,7 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down...")
+    await google_ads.close_http_client()
 
 
 app = FastAPI(
@@ -242,12 +310,17 @@ cors_origins = [
     "https://zafesys-suite-soccompraloenacasa-ui.vercel.app",
 ]
 
+# Compress JSON bodies for technician phones on mobile data; level 5 gets most
+# of the ratio of level 9 for a fraction of the CPU
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API routes
@@ -259,7 +332,7 @@ app.include_router(legal.router, tags=["Legal"])
 
 
 @app.get("/")
-def root():
+async def root():
     """Root endpoint."""
     return {
         "name": settings.APP_NAME,
@@ -271,13 +344,13 @@ def root():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Health check endpoint for Railway."""
     return {"status": "healthy"}
 
 
 @app.get("/api/v1/health")
-def api_health_check():
+async def api_health_check():
     """API health check endpoint."""
     return {
         "status": "healthy",
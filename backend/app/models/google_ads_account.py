@@ -1,8 +1,9 @@
 """
 ZAFESYS Suite - Google Ads Account Model
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
 from sqlalchemy.sql import func
+from app.core.security import EncryptedText
 from app.database import Base
 
 
@@ -15,10 +16,11 @@ class GoogleAdsAccount(Base):
     customer_id = Column(String(20), nullable=True)  # Google Ads Customer ID (format: 123-456-7890)
     account_name = Column(String(255), nullable=True)
     email = Column(String(255), nullable=True)
-    access_token = Column(Text, nullable=True)
-    refresh_token = Column(Text, nullable=True)
+    access_token = Column(EncryptedText, nullable=True)
+    refresh_token = Column(EncryptedText, nullable=True)
     expires_at = Column(DateTime(timezone=True), nullable=True)
     connected = Column(Boolean, default=False)
+    is_manager = Column(Boolean, default=False)  # MCC accounts have no metrics of their own
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -1,7 +1,8 @@
 """
 ZAFESYS Suite - Installation Model
 """
-from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, Date, Time, Enum as SQLEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Numeric, Boolean, DateTime, Date, Time, Enum as SQLEnum, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -94,8 +95,8 @@ class Installation(Base):
 
     # Media - Photos, Signature, Video
     signature_url = Column(String(500), nullable=True)  # Customer signature
-    photos_before = Column(Text, nullable=True)  # JSON array of photo URLs before installation
-    photos_after = Column(Text, nullable=True)   # JSON array of photo URLs after installation
+    photos_before = Column(JSONB, nullable=True)  # Array of photo URLs before installation
+    photos_after = Column(JSONB, nullable=True)   # Array of photo URLs after installation
     video_url = Column(String(500), nullable=True)  # Installation video URL
 
     # Warehouse/Bodega status
@@ -108,3 +109,21 @@ class Installation(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Reporting: ROI aggregates filter completed installations by date
+    # Listing: keyset pagination walks (created_at, id) backwards; /, /by-date and /pending filters
+    # Analytics: completed installations in a scheduled_date range; lead_id backs the FK
+    __table_args__ = (
+        Index('idx_installations_status_completed_at', 'status', 'completed_at'),
+        Index('idx_installations_created_at_id', 'created_at', 'id'),
+        Index('idx_installations_status_created_at', 'status', created_at.desc()),
+        Index('idx_installations_date_technician', 'scheduled_date', 'technician_id'),
+        Index('idx_installations_date_time', 'scheduled_date', 'scheduled_time'),
+        Index(
+            'idx_installations_pending', 'created_at',
+            postgresql_where=text("status = 'pendiente'")
+        ),
+        Index('idx_installations_status_scheduled_date', 'status', scheduled_date.desc()),
+        Index('idx_installations_lead_id', 'lead_id'),
+        Index('idx_installations_technician_date_time', 'technician_id', 'scheduled_date', 'scheduled_time'),
+    )
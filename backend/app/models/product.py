@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Numeric, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, Text, Boolean, DateTime, Index, text
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -21,3 +21,15 @@ class Product(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Trigram indexes back the ILIKE '%q%' search; partial ones the active/low-stock listings
+    __table_args__ = (
+        Index('idx_products_name_trgm', 'name', postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'}),
+        Index('idx_products_model_trgm', 'model', postgresql_using='gin', postgresql_ops={'model': 'gin_trgm_ops'}),
+        Index('idx_products_sku_trgm', 'sku', postgresql_using='gin', postgresql_ops={'sku': 'gin_trgm_ops'}),
+        Index('idx_products_active_name_id', 'name', 'id', postgresql_where=text('is_active = true')),
+        Index(
+            'idx_products_low_stock', 'id',
+            postgresql_where=text('is_active = true AND stock <= min_stock_alert')
+        ),
+    )
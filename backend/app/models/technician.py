@@ -1,9 +1,10 @@
 """
 ZAFESYS Suite - Technician Model
 """
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Float, Computed, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from app.core.security import EncryptedText
 from app.database import Base
 
 
@@ -19,6 +20,8 @@ class Technician(Base):
     # Personal info
     full_name = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=False)
+    # Digits-only copy of phone maintained by PostgreSQL, for exact-match login lookups
+    phone_digits = Column(String(20), Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True))
     email = Column(String(255), nullable=True)
 
     # Work info
@@ -26,8 +29,8 @@ class Technician(Base):
     zone = Column(String(100), nullable=True)  # Area they cover
     specialties = Column(Text, nullable=True)  # Types of locks they can install
 
-    # Auth for mobile app (simple PIN)
-    pin = Column(String(6), nullable=True)  # 4-6 digit PIN for tech app login
+    # Auth for mobile app (simple PIN) - encrypted at rest, admins can still read it
+    pin = Column(EncryptedText(cache_decrypted=False), nullable=True)  # 4-6 digit PIN for tech app login
 
     # Status
     is_available = Column(Boolean, default=True)
@@ -44,6 +47,11 @@ class Technician(Base):
     installations = relationship("Installation", back_populates="technician")
     locations = relationship("TechnicianLocation", back_populates="technician", order_by="desc(TechnicianLocation.recorded_at)")
 
+    __table_args__ = (
+        Index('idx_technicians_phone', 'phone'),
+        Index('idx_technicians_phone_digits', 'phone_digits'),
+    )
+
 
 class TechnicianLocation(Base):
     """
@@ -53,7 +61,7 @@ class TechnicianLocation(Base):
     __tablename__ = "technician_locations"
 
     id = Column(Integer, primary_key=True, index=True)
-    technician_id = Column(Integer, ForeignKey("technicians.id"), nullable=False, index=True)
+    technician_id = Column(Integer, ForeignKey("technicians.id"), nullable=False)
     
     # GPS coordinates
     latitude = Column(Float, nullable=False)
@@ -73,8 +81,16 @@ class TechnicianLocation(Base):
     installation_id = Column(Integer, ForeignKey("installations.id"), nullable=True)
     
     # Timestamp
-    recorded_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     technician = relationship("Technician", back_populates="locations")
     installation = relationship("Installation")
+
+    __table_args__ = (
+        Index('idx_tech_locations_tech_time', 'technician_id', recorded_at.desc()),
+        Index(
+            'idx_tech_locations_recorded_at_brin', 'recorded_at',
+            postgresql_using='brin', postgresql_with={'pages_per_range': 32}
+        ),
+    )
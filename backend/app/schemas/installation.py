@@ -1,8 +1,8 @@
 """
 ZAFESYS Suite - Installation Schemas
 """
-from pydantic import BaseModel
-from typing import Optional, Literal
+from pydantic import BaseModel, field_validator
+from typing import List, Optional, Literal
 from datetime import datetime, date, time
 from decimal import Decimal
 from app.models.installation import InstallationStatus, PaymentStatus, PaymentMethod
@@ -110,8 +110,8 @@ class InstallationResponse(InstallationBase):
     installation_duration_minutes: Optional[int] = None
     # Media fields
     signature_url: Optional[str] = None
-    photos_before: Optional[str] = None  # JSON string
-    photos_after: Optional[str] = None   # JSON string
+    photos_before: Optional[List[str]] = None
+    photos_after: Optional[List[str]] = None
     video_url: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
@@ -132,7 +132,10 @@ class InstallationWithDetails(InstallationResponse):
 
 
 class InstallationAppResponse(BaseModel):
-    """Response for technician app with lead and product details."""
+    """Response for technician app with lead and product details.
+
+    Money fields are floats: the app has always received JSON numbers here.
+    """
     id: int
     lead_id: int
     product_id: int
@@ -140,7 +143,7 @@ class InstallationAppResponse(BaseModel):
     address: str
     city: Optional[str] = None
     address_notes: Optional[str] = None
-    total_price: Decimal
+    total_price: float
     customer_notes: Optional[str] = None
     technician_id: Optional[int] = None
     scheduled_date: Optional[date] = None
@@ -149,7 +152,7 @@ class InstallationAppResponse(BaseModel):
     status: str
     payment_status: str
     payment_method: Optional[str] = None
-    amount_paid: Decimal = Decimal("0")
+    amount_paid: float = 0
     technician_notes: Optional[str] = None
     completed_at: Optional[datetime] = None
     timer_started_at: Optional[datetime] = None
@@ -160,8 +163,8 @@ class InstallationAppResponse(BaseModel):
     updated_at: Optional[datetime] = None
     # Media
     signature_url: Optional[str] = None
-    photos_before: Optional[list[str]] = None
-    photos_after: Optional[list[str]] = None
+    photos_before: Optional[List[str]] = None
+    photos_after: Optional[List[str]] = None
     video_url: Optional[str] = None
     # Related data
     lead_name: Optional[str] = None
@@ -171,6 +174,16 @@ class InstallationAppResponse(BaseModel):
     product_image: Optional[str] = None
     technician_name: Optional[str] = None
 
+    @field_validator('estimated_duration', mode='before')
+    @classmethod
+    def default_estimated_duration(cls, v):
+        return 60 if v is None else v
+
+    @field_validator('amount_paid', mode='before')
+    @classmethod
+    def default_amount_paid(cls, v):
+        return 0 if v is None else v
+
     class Config:
         from_attributes = True
 